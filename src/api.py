@@ -0,0 +1,113 @@
+from dataclasses          import dataclass
+from core.banner_grabber  import Banner_Grabber
+from core.network_mapper  import Network_Mapper
+from core.path_tracer     import Path_Tracer
+from core.port_scanner    import Port_Scanner
+from models.data          import Data
+from utils.dns_resolver   import DNS_Resolver
+from utils.os_fingerprint import OS_Fingerprint
+
+
+@dataclass(frozen=True, slots=True)
+class Scan_Result:
+    target:str
+    ports:dict[int, str]
+    metrics:dict
+    os:str|None = None
+
+    @property
+    def open_ports(self) -> list[int]:
+        return sorted(port for port, status in self.ports.items() if status in ('OPENED', 'POTENTIALLY OPENED'))
+
+
+
+@dataclass(frozen=True, slots=True)
+class Map_Result:
+    hosts:dict[str, dict]
+    metrics:dict
+
+
+
+@dataclass(frozen=True, slots=True)
+class Trace_Result:
+    paths:dict[str, list]
+    links:dict[tuple, int]
+    metrics:dict
+
+
+
+PSCAN_OPTIONS:dict  = {
+    'random': False, 'delay': False, 'protocol': 'TCP', 'grab': False, 'connect': False, 'max_in_flight': 1000, 'connect_timeout': 1.0,
+    'top_ports': None
+}
+NETMAP_OPTIONS:dict = {
+    'arp': False, 'watch': None, 'probes': None, 'rate': 1000, 'targets_file': None, 'exclude_file': None
+}
+TRACE_OPTIONS:dict  = {
+    'protocol': 'UDP', 'port': None, 'max_ttl': 30, 'rate': 1000, 'wait': 3, 'dot': None, 'targets_file': None, 'exclude_file': None
+}
+BANNER_OPTIONS:dict = {
+    'port': None, 'concurrency': 100, 'per_host': 4, 'connect_timeout': 5, 'read_timeout': 5, 'sni': None, 'paths': None
+}
+
+
+
+def scan_ports(target:str, ports:str|list[int]=None, options:dict=None,
+               resolver:DNS_Resolver=None, transport:object=None, writer:object=None) -> Scan_Result:
+    arguments:dict = {**PSCAN_OPTIONS, **(options or {}), 'ports': _port_string(ports)}
+    data:Data      = _create_data('pscan', arguments, resolver, transport)
+    data.target_ip = target
+    data.writer    = writer
+
+    scanner:Port_Scanner = Port_Scanner(data, display_progress=False)
+    scanner.run()
+    return Scan_Result(
+        data.target_ip, scanner.port_states(), data.metrics.snapshot(), OS_Fingerprint.guess(data.fingerprints.get(data.target_ip))
+    )
+
+
+
+def map_network(targets:list[str]=None, options:dict=None,
+                resolver:DNS_Resolver=None, transport:object=None) -> Map_Result:
+    arguments:dict = {**NETMAP_OPTIONS, **(options or {}), 'watch': None, 'targets': targets}
+    data:Data      = _create_data('netmap', arguments, resolver, transport)
+
+    hosts:dict = Network_Mapper(data, display_progress=False).run()
+    return Map_Result(hosts, data.metrics.snapshot())
+
+
+
+def trace_paths(targets:list[str]=None, options:dict=None,
+                resolver:DNS_Resolver=None, transport:object=None) -> Trace_Result:
+    arguments:dict = {**TRACE_OPTIONS, **(options or {}), 'targets': list(targets) if targets else None}
+    data:Data      = _create_data('trace', arguments, resolver, transport)
+
+    paths, links = Path_Tracer(data, display_progress=False).run()
+    return Trace_Result(paths, links, data.metrics.snapshot())
+
+
+
+async def grab_banners(hosts:list[str], protocol:str, options:dict=None, resolver:DNS_Resolver=None) -> list[dict]:
+    arguments:dict = {**BANNER_OPTIONS, **(options or {}), 'protocol': protocol}
+    data:Data      = _create_data('banner', arguments, resolver)
+    data.target_ip = list(hosts)
+    return await Banner_Grabber(data).run()
+
+
+
+def _create_data(command_name:str, arguments:dict, resolver:DNS_Resolver|None, transport:object=None) -> Data:
+    data:Data = Data(command_name=command_name, arguments=arguments)
+    if transport is not None:
+        data.transport = transport
+        data.resolver  = transport.resolver()
+    if resolver is not None:
+        data.resolver = resolver
+    return data
+
+
+
+def _port_string(ports:str|list[int]|None) -> str|None:
+    if ports is None or isinstance(ports, str):
+        return ports
+    return ','.join(str(port) for port in ports)
+
@@ -1,18 +1,10 @@
 import argparse
-from models.data import Data
+from models.data         import Data
+from utils.result_writer import Result_Writer
 
 
 class ArgParser_Manager:
 
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
-
-    
-
     __slots__ = ('_data', '_parser', '_definitions')
 
     def __init__(self, data:Data):
@@ -21,6 +13,11 @@ class ArgParser_Manager:
         self._definitions = {
         'pscan':  self._validate_and_get_pscan_arguments,
         'banner': self._validate_and_get_bgrab_arguments,
+        'netmap': self._validate_and_get_netmap_arguments,
+        'diff':   self._validate_and_get_diff_arguments,
+        'coord':  self._validate_and_get_coordinator_arguments,
+        'worker': self._validate_and_get_worker_arguments,
+        'trace':  self._validate_and_get_trace_arguments,
     }
 
 
@@ -31,38 +28,287 @@ class ArgParser_Manager:
 
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__class__._instance = None
         return False
     
 
 
+    def _load_dns_cache(self) -> None:
+        if self._parser.dns_cache:
+            self._data.resolver.load_cache(self._parser.dns_cache)
+
+
+
+    def _set_metrics_output(self) -> None:
+        if self._parser.metrics:
+            self._data.metrics.set_output(self._parser.metrics)
+
+
+
+    def _open_output(self) -> None:
+        if self._parser.output:
+            self._data.writer = Result_Writer(*self._parser.output)
+
+
+
+    def _open_history(self) -> None:
+        if self._parser.history:
+            from utils.scan_history import Scan_History
+            self._data.history = Scan_History() if self._parser.history is True else Scan_History(self._parser.history)
+
+
+
+    def _enable_profiler(self) -> None:
+        if self._parser.profile:
+            from utils.stage_profiler import Stage_Profiler
+            self._data.metrics.profiler = Stage_Profiler() if self._parser.profile is True else Stage_Profiler(self._parser.profile)
+
+
+
+    def _validate_top_ports(self) -> None:
+        if self._parser.top_ports is None: return
+        if self._parser.ports:
+            raise ValueError('Use either --ports or --top-ports')
+        if not 1 <= self._parser.top_ports <= 65535:
+            raise ValueError('The number of top ports must be between 1 and 65535')
+
+
+
+    def _use_simulated_network(self) -> None:
+        if self._parser.simulate:
+            from transport.simulated_transport import Simulated_Transport
+            self._data.transport = Simulated_Transport.from_file(self._parser.simulate)
+            self._data.resolver  = self._data.transport.resolver()
+
+
+
     def _validate_and_get_pscan_arguments(self) -> dict:
         self._parser.add_argument('host', type=str, help='Target IP/Hostname')
         self._parser.add_argument('-r', '--random', action='store_true', help='Use the ports in random order')
         self._parser.add_argument('-p', '--ports', type=str, help='Specify ports to scan')
+        self._parser.add_argument('--top-ports', type=int, help='Scan the N ports most often found open (default 100)')
         self._parser.add_argument('-d', '--delay', nargs='?', const=True, default=False, help='Add a delay between packet transmissions')
         self._parser.add_argument('-U', '--UDP', action='store_const', const='UDP', default=None, help='Perform UDP portscan')
+        self._parser.add_argument('-g', '--grab', action='store_true', help='Grab banners from opened ports while the scan is running')
+        self._parser.add_argument('-T', '--connect', action='store_true', help='Use connect() calls instead of raw packets (no root needed, TCP only)')
+        self._parser.add_argument('--max-in-flight', type=int, default=1000, help='Connections open at the same time in connect mode')
+        self._parser.add_argument('--connect-timeout', type=float, default=1.0, help='Seconds allowed for each connection in connect mode')
+        self._parser.add_argument('--dns-cache', type=str, help='File used to persist resolved names between runs')
+        self._parser.add_argument('-o', '--output', nargs=2, metavar=('FORMAT', 'PATH'), help='Stream results as jsonl or csv to PATH (- for stdout)')
+        self._parser.add_argument('--history', nargs='?', const=True, help='Save the results in a SQLite database (default netxplorer.db)')
+        self._parser.add_argument('--metrics', type=str, help='JSON file where the scan metrics are written')
+        self._parser.add_argument('--profile', nargs='?', const=True, help='Profile each stage and save the stats in a .pstats file (default netxplorer.pstats)')
+        self._parser.add_argument('--simulate', type=str, metavar='FILE', help='Run against the virtual network described in a JSON file (no privileges needed)')
         self._parser = self._parser.parse_args(self._data.arguments)
 
+        if self._parser.connect and self._parser.UDP:
+            raise ValueError('The connect mode only scans TCP ports')
+
+        self._validate_top_ports()
+
+        self._load_dns_cache()
+        self._set_metrics_output()
+        self._enable_profiler()
+        self._open_history()
+        self._open_output()
+        self._use_simulated_network()
+
         self._data.target_ip = self._parser.host
         self._data.arguments = {
-            'ports':    self._parser.ports,
-            'random':   self._parser.random,
-            'delay':    self._parser.delay,
-            'protocol': self._parser.UDP or 'TCP'
+            'ports':           self._parser.ports,
+            'top_ports':       self._parser.top_ports,
+            'random':          self._parser.random,
+            'delay':           self._parser.delay,
+            'protocol':        self._parser.UDP or 'TCP',
+            'grab':            self._parser.grab,
+            'connect':         self._parser.connect,
+            'max_in_flight':   self._parser.max_in_flight,
+            'connect_timeout': self._parser.connect_timeout
         }
 
 
 
     def _validate_and_get_bgrab_arguments(self) -> None:
         PROTOCOLS = ['ftp', 'ssh', 'http', 'https']
-        self._parser.add_argument('host', type=str, help='Target IP/Hostname')
+        self._parser.add_argument('host', type=str, help='Target IPs/Hostnames (comma-separated)')
         self._parser.add_argument('protocol', type=str, choices=PROTOCOLS, help='Protocol')
-        self._parser.add_argument('-p', '--port', type=str, help='Specify a port to grab the banners')
+        self._parser.add_argument('-p', '--port', type=str, help='Specify ports to grab the banners')
+        self._parser.add_argument('-c', '--concurrency', type=int, default=100, help='Maximum number of simultaneous connections')
+        self._parser.add_argument('--per-host', type=int, default=4, help='Maximum number of simultaneous connections per host')
+        self._parser.add_argument('--connect-timeout', type=float, default=5, help='Timeout for connecting (and TLS handshake)')
+        self._parser.add_argument('--read-timeout', type=float, default=5, help='Timeout for reading the banner')
+        self._parser.add_argument('--sni', type=str, help='Server names (comma-separated) sent in the HTTPS handshake')
+        self._parser.add_argument('--paths', type=str, help='HTTP(S) paths (comma-separated) requested over one keep-alive connection')
+        self._parser.add_argument('--tls-cache', type=str, help='File used to persist grabbed certificates between runs')
+        self._parser.add_argument('--history', nargs='?', const=True, help='Save the results in a SQLite database (default netxplorer.db)')
+        self._parser.add_argument('--metrics', type=str, help='JSON file where the scan metrics are written')
+        self._parser.add_argument('--profile', nargs='?', const=True, help='Profile each stage and save the stats in a .pstats file (default netxplorer.pstats)')
         self._parser = self._parser.parse_args(self._data.arguments)
 
-        self._data.target_ip = self._parser.host
+        self._set_metrics_output()
+        self._enable_profiler()
+        self._open_history()
+
+        if self._parser.tls_cache:
+            self._data.tls_cache.load_cache(self._parser.tls_cache)
+
+        self._data.target_ip = self._parser.host.split(',')
+        self._data.arguments = {
+            'protocol':        self._parser.protocol,
+            'port':            self._parser.port,
+            'concurrency':     self._parser.concurrency,
+            'per_host':        self._parser.per_host,
+            'connect_timeout': self._parser.connect_timeout,
+            'read_timeout':    self._parser.read_timeout,
+            'sni':             self._parser.sni.split(',') if self._parser.sni else None,
+            'paths':           self._parser.paths.split(',') if self._parser.paths else None
+        }
+
+
+
+    def _validate_and_get_netmap_arguments(self) -> None:
+        self._parser.add_argument('-a', '--arp', action='store_true', help='Discover hosts with an ARP sweep (local subnet only)')
+        self._parser.add_argument('-t', '--targets', type=str, help='Networks to map (comma-separated CIDRs), default is the local subnet')
+        self._parser.add_argument('--targets-file', type=str, help='File with CIDRs, ranges or host names to map (one or more per line)')
+        self._parser.add_argument('--exclude-file', type=str, help='File with CIDRs, ranges or host names that must never be probed')
+        self._parser.add_argument('-w', '--watch', type=float, help='Keep mapping every N seconds and print only the changes')
+        self._parser.add_argument('--probes', type=str, help='Discovery probes, e.g. echo,timestamp,syn:22/80/443,ack:80,udp:53/161')
+        self._parser.add_argument('--rate', type=float, default=1000, help='Probes sent per second')
+        self._parser.add_argument('--dns-cache', type=str, help='File used to persist resolved names between runs')
+        self._parser.add_argument('-o', '--output', nargs=2, metavar=('FORMAT', 'PATH'), help='Stream results as jsonl or csv to PATH (- for stdout)')
+        self._parser.add_argument('--history', nargs='?', const=True, help='Save the results in a SQLite database (default netxplorer.db)')
+        self._parser.add_argument('--metrics', type=str, help='JSON file where the scan metrics are written')
+        self._parser.add_argument('--profile', nargs='?', const=True, help='Profile each stage and save the stats in a .pstats file (default netxplorer.pstats)')
+        self._parser.add_argument('--simulate', type=str, metavar='FILE', help='Run against the virtual network described in a JSON file (no privileges needed)')
+        self._parser = self._parser.parse_args(self._data.arguments)
+
+        self._load_dns_cache()
+        self._set_metrics_output()
+        self._enable_profiler()
+        self._open_history()
+        self._open_output()
+        self._use_simulated_network()
+
+        self._data.arguments = {
+            'arp':          self._parser.arp,
+            'watch':        self._parser.watch,
+            'probes':       self._parser.probes,
+            'rate':         self._parser.rate,
+            'targets':      self._parser.targets.split(',') if self._parser.targets else None,
+            'targets_file': self._parser.targets_file,
+            'exclude_file': self._parser.exclude_file
+        }
+
+
+
+    def _validate_and_get_diff_arguments(self) -> None:
+        self._parser.add_argument('old', nargs='?', default='last~1', help='Older scan (id, last or last~N)')
+        self._parser.add_argument('new', nargs='?', default='last', help='Newer scan (id, last or last~N)')
+        self._parser.add_argument('-l', '--list', action='store_true', help='List the saved scans')
+        self._parser.add_argument('--history', default=True, help='SQLite database with the saved scans (default netxplorer.db)')
+        self._parser = self._parser.parse_args(self._data.arguments)
+
+        self._open_history()
+
+        self._data.arguments = {
+            'old':  self._parser.old,
+            'new':  self._parser.new,
+            'list': self._parser.list
+        }
+
+
+
+    def _validate_and_get_coordinator_arguments(self) -> None:
+        self._parser.add_argument('targets', type=str, help='Target IPs/Hostnames/CIDRs (comma-separated)')
+        self._parser.add_argument('-p', '--ports', type=str, help='Specify ports to scan')
+        self._parser.add_argument('--top-ports', type=int, help='Scan the N ports most often found open (default 100)')
+        self._parser.add_argument('-r', '--random', action='store_true', help='Use the ports in random order')
+        self._parser.add_argument('-d', '--delay', nargs='?', const=True, default=False, help='Add a delay between packet transmissions')
+        self._parser.add_argument('-U', '--UDP', action='store_const', const='UDP', default=None, help='Perform UDP portscan')
+        self._parser.add_argument('-T', '--connect', action='store_true', help='Workers use connect() calls instead of raw packets (TCP only)')
+        self._parser.add_argument('--max-in-flight', type=int, default=1000, help='Connections open at the same time in connect mode')
+        self._parser.add_argument('--connect-timeout', type=float, default=1.0, help='Seconds allowed for each connection in connect mode')
+        self._parser.add_argument('--simulate', type=str, metavar='FILE', help='Workers scan the virtual network described in a JSON file')
+        self._parser.add_argument('-l', '--listen', type=str, default='0.0.0.0:7171', help='Address for the workers (host:port or unix:path)')
+        self._parser.add_argument('--shard-size', type=int, default=256, help='Number of ports of one target given to a worker at a time')
+        self._parser.add_argument('--shard-timeout', type=float, default=600, help='Seconds without news before a shard is given to another worker')
+        self._parser.add_argument('-o', '--output', nargs=2, metavar=('FORMAT', 'PATH'), help='Stream results as jsonl or csv to PATH (- for stdout)')
+        self._parser.add_argument('--metrics', type=str, help='JSON file where the scan metrics are written')
+        self._parser = self._parser.parse_args(self._data.arguments)
+
+        if self._parser.connect and self._parser.UDP:
+            raise ValueError('The connect mode only scans TCP ports')
+
+        self._validate_top_ports()
+        self._set_metrics_output()
+        self._open_output()
+
+        self._data.arguments = {
+            'targets':         self._parser.targets.split(','),
+            'ports':           self._parser.ports,
+            'top_ports':       self._parser.top_ports,
+            'random':          self._parser.random,
+            'delay':           self._parser.delay,
+            'protocol':        self._parser.UDP or 'TCP',
+            'connect':         self._parser.connect,
+            'max_in_flight':   self._parser.max_in_flight,
+            'connect_timeout': self._parser.connect_timeout,
+            'simulate':        self._parser.simulate,
+            'listen':          self._parser.listen,
+            'shard_size':      self._parser.shard_size,
+            'shard_timeout':   self._parser.shard_timeout
+        }
+
+
+
+    def _validate_and_get_worker_arguments(self) -> None:
+        self._parser.add_argument('coordinator', type=str, help='Coordinator address (host:port or unix:path)')
+        self._parser.add_argument('--dns-cache', type=str, help='File used to persist resolved names between runs')
+        self._parser = self._parser.parse_args(self._data.arguments)
+
+        self._load_dns_cache()
+
+        self._data.arguments = {'coordinator': self._parser.coordinator}
+
+
+
+
+    def _validate_and_get_trace_arguments(self) -> None:
+        self._parser.add_argument('targets', type=str, nargs='?', help='Target IPs/Hostnames/CIDRs/ranges (comma-separated)')
+        self._parser.add_argument('--targets-file', type=str, help='File with CIDRs, ranges or host names to trace (one or more per line)')
+        self._parser.add_argument('--exclude-file', type=str, help='File with CIDRs, ranges or host names that must never be probed')
+        self._parser.add_argument('-P', '--protocol', type=str.upper, choices=['UDP', 'TCP', 'ICMP'], default='UDP', help='Probe protocol')
+        self._parser.add_argument('-p', '--port', type=int, help='Destination port of the probes (default 33434 for UDP, 80 for TCP)')
+        self._parser.add_argument('-m', '--max-ttl', type=int, default=30, help='Maximum number of hops (up to 63)')
+        self._parser.add_argument('-r', '--rate', type=float, default=1000, help='Probes sent per second')
+        self._parser.add_argument('-w', '--wait', type=float, default=3, help='Seconds to wait for replies after the last probe')
+        self._parser.add_argument('--dot', type=str, help='Save the topology graph in a Graphviz .dot file')
+        self._parser.add_argument('--dns-cache', type=str, help='File used to persist resolved names between runs')
+        self._parser.add_argument('-o', '--output', nargs=2, metavar=('FORMAT', 'PATH'), help='Stream results as jsonl or csv to PATH (- for stdout)')
+        self._parser.add_argument('--metrics', type=str, help='JSON file where the scan metrics are written')
+        self._parser.add_argument('--profile', nargs='?', const=True, help='Profile each stage and save the stats in a .pstats file (default netxplorer.pstats)')
+        self._parser.add_argument('--simulate', type=str, metavar='FILE', help='Run against the virtual network described in a JSON file (no privileges needed)')
+        self._parser = self._parser.parse_args(self._data.arguments)
+
+        if not 1 <= self._parser.max_ttl <= 63:
+            raise ValueError('The maximum TTL must be between 1 and 63')
+
+        if not self._parser.targets and not self._parser.targets_file:
+            raise ValueError('Give the targets or a --targets-file')
+
+        self._load_dns_cache()
+        self._set_metrics_output()
+        self._enable_profiler()
+        self._open_output()
+        self._use_simulated_network()
+
         self._data.arguments = {
-            'protocol': self._parser.protocol,
-            'port':     self._parser.port
+            'targets':      self._parser.targets.split(',') if self._parser.targets else None,
+            'targets_file': self._parser.targets_file,
+            'exclude_file': self._parser.exclude_file,
+            'protocol':     self._parser.protocol,
+            'port':         self._parser.port,
+            'max_ttl':      self._parser.max_ttl,
+            'rate':         self._parser.rate,
+            'wait':         self._parser.wait,
+            'dot':          self._parser.dot
         }
\ No newline at end of file
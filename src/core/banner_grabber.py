@@ -1,23 +1,26 @@
+import asyncio
 import socket
 import ssl
-from models.data import Data
+import time
+from concurrent.futures        import ThreadPoolExecutor
+from threading                 import Thread, Event
+from models.data               import Data
+from utils.http_parser         import HTTP_Response_Parser, http_request
+from utils.service_fingerprint import Service_Fingerprint
+from utils.tls_cache           import TLS_Cache, decode_certificate
 
 
 class Banner_Grabber:
 
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
+    __slots__ = ('_data', '_global_limit', '_host_limits', '_timeouts', '_executor', '_results')
 
-
-
-    __slots__ = ('_data')
-
-    def __init__(self, data:dict) -> None:
-        self._data:Data = data
+    def __init__(self, data:Data) -> None:
+        self._data:Data                      = data
+        self._global_limit:asyncio.Semaphore = None
+        self._host_limits:dict               = {}
+        self._timeouts:dict                  = {}
+        self._executor:ThreadPoolExecutor    = None
+        self._results:list[dict]             = []
 
 
 
@@ -25,25 +28,70 @@ class Banner_Grabber:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__class__._instance = None
         return False
 
 
 
     def execute(self) -> None:
-        try:   self._grab_banners_on_the_protocol()
-        except KeyboardInterrupt:               print('Process stopped')
-        except ConnectionRefusedError as error: print(f'Connection refused: {error}')
-        except socket.timeout as error:         print(f'Timeout: {error}')
-        except socket.error as error:           print(f'Socket error: {error}')
-        except Exception as error:              print(f'ERROR: {error}')
+        try:
+            asyncio.run(self.run(on_result=display_banner))
+            grabbed:int = sum(result['status'] == 'ok' for result in self._results)
+            print(f'Banners grabbed: {grabbed}/{len(self._results)}')
+            self._data.save_history(','.join(dict.fromkeys(self._data.target_ip)), banners=[
+                (result['host'], result['port'], result['status'], (result['service'] or {}).get('product'),
+                 '\n'.join(result['banner']) or result['error'])
+                for result in self._results
+            ])
+        except KeyboardInterrupt:  print('Process stopped')
+        except Exception as error: print(f'ERROR: {error}')
+
+
+
+    async def run(self, on_result:callable=None) -> list[dict]:
+        protocol:dict = self._protocol_dictionary().get(self._data.arguments['protocol'])
+        self._data.target_ports = self._data.arguments['port'] or str(protocol['port'])
+        self._prepare_limits()
+        if protocol['func'] is https_banner_grabbing:
+            self._executor = tls_executor(self._data.arguments['concurrency'])
+
+        tasks:list = [
+            asyncio.create_task(self._grab(protocol['func'], host, port, server_name))
+            for port in self._data.target_ports
+            for host in dict.fromkeys(self._data.target_ip)
+            for server_name in self._data.arguments['sni'] or [None]
+        ]
+
+        try:
+            with self._data.metrics.stage('grabbing'):
+                for finished_task in asyncio.as_completed(tasks):
+                    result:dict = await finished_task
+                    self._results.append(result)
+                    self._data.metrics.count('banners_grabbed' if result['status'] == 'ok' else 'banners_failed')
+                    if on_result is not None: on_result(result)
+        finally:
+            if self._executor is not None: self._executor.shutdown(wait=False, cancel_futures=True)
+
+        return self._results
+
+
+
+    def _prepare_limits(self) -> None:
+        self._global_limit = asyncio.Semaphore(self._data.arguments['concurrency'])
+        self._host_limits  = {host: asyncio.Semaphore(self._data.arguments['per_host']) for host in self._data.target_ip}
+        self._timeouts     = {
+            'connect': self._data.arguments['connect_timeout'],
+            'read':    self._data.arguments['read_timeout']
+        }
 
 
 
-    def _grab_banners_on_the_protocol(self) -> None:
-        protocol = self._protocol_dictionary().get(self._data.arguments['protocol'])
-        port     = self._data.arguments['port'] or protocol['port']
-        protocol['func'](self._data.target_ip, port)
+    async def _grab(self, func:callable, host:str, port:int, server_name:str|None) -> dict:
+        async with self._global_limit, self._host_limits[host]:
+            return await grab_banner(
+                func, host, port, self._timeouts,
+                tls_cache=self._data.tls_cache, server_name=server_name, paths=self._data.arguments['paths'],
+                executor=self._executor
+            )
 
 
 
@@ -59,62 +107,322 @@ class Banner_Grabber:
 
 
 
+# PIPELINE ===================================================================================================
+
+class Banner_Pipeline:
+
+    __slots__ = ('_concurrency', '_timeouts', '_tls_cache', '_executor', '_loop', '_queue', '_thread', '_ready', '_results')
+
+    def __init__(self, concurrency:int=20, timeouts:dict=None, tls_cache:TLS_Cache=None) -> None:
+        self._concurrency:int                = concurrency
+        self._timeouts:dict                  = timeouts or {'connect': 5, 'read': 5}
+        self._tls_cache:TLS_Cache            = tls_cache or TLS_Cache()
+        self._executor:ThreadPoolExecutor    = tls_executor(concurrency)
+        self._loop:asyncio.AbstractEventLoop = None
+        self._queue:asyncio.Queue            = None
+        self._thread:Thread                  = Thread(target=lambda: asyncio.run(self._run()))
+        self._ready:Event                    = Event()
+        self._results:list[dict]             = []
+
+
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for _ in range(self._concurrency):
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        self._thread.join()
+        return False
+
+
+
+    @property
+    def results(self) -> list[dict]:
+        return self._results
+
+
+
+    def submit(self, protocol:str, host:str, port:int) -> None:
+        func:callable = Banner_Grabber._protocol_dictionary()[protocol]['func']
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (func, host, port))
+
+
+
+    async def _run(self) -> None:
+        self._loop  = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        try:     await asyncio.gather(*(self._worker() for _ in range(self._concurrency)))
+        finally: self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+
+    async def _worker(self) -> None:
+        while (job := await self._queue.get()) is not None:
+            result:dict = await grab_banner(*job, self._timeouts, tls_cache=self._tls_cache, executor=self._executor)
+            self._results.append(result)
+            display_banner(result)
+
+
+
+
+# RESULTS ====================================================================================================
+
+def banner_result(host:str, port:int, protocol:str, lines:list[str]) -> dict:
+    service:dict = Service_Fingerprint.match('\n'.join(lines))
+    return {'host': host, 'port': port, 'protocol': protocol, 'status': 'ok', 'banner': lines, 'service': service, 'error': None}
+
+
+
+def failed_result(host:str, port:int, func:callable, error:str) -> dict:
+    protocol:str = func.__name__.split('_')[0]
+    return {'host': host, 'port': port, 'protocol': protocol, 'status': 'error', 'banner': [], 'service': None, 'error': error}
+
+
+
+def display_banner(result:dict) -> None:
+    target:str = f'{result["host"]}:{result["port"]}'
+
+    if result['status'] != 'ok':
+        print(f'[-] {target:<21} {result["protocol"]:<5} -> {result["error"]}')
+        return
+
+    if not result['banner']:
+        print(f'[-] {target:<21} {result["protocol"]:<5} -> No banner received')
+        return
+
+    print(f'[+] {target:<21} {result["protocol"]:<5} -> {result["banner"][0]}')
+    for line in result['banner'][1:]:
+        print(f'{30 * " "}{line}')
+
+    if result['service']:
+        service:dict = result['service']
+        print(f'{30 * " "}Service: {service["product"]} {service["version"] or ""} ({service["cpe"]})')
+
+
+
+
+# CONNECTION PHASES ==========================================================================================
+
+class Phase_Timeout(Exception): ...
+
+
+
+async def grab_banner(func:callable, host:str, port:int, timeouts:dict, **options) -> dict:
+    try:
+        return await func(host, port, timeouts, **options)
+    except Phase_Timeout as error:
+        return failed_result(host, port, func, f'Timeout ({error})')
+    except ConnectionRefusedError:
+        return failed_result(host, port, func, 'Connection refused')
+    except (OSError, ssl.SSLError) as error:
+        return failed_result(host, port, func, f'Socket error: {error}')
+    except ValueError as error:
+        return failed_result(host, port, func, f'Invalid response: {error}')
+
+
+
+async def open_connection(host:str, port:int, timeouts:dict, **kwargs) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    try:
+        return await asyncio.wait_for(asyncio.open_connection(host, port, **kwargs), timeouts['connect'])
+    except asyncio.TimeoutError:
+        raise Phase_Timeout('connect')
+
+
+
+async def read_response(reader:asyncio.StreamReader, size:int, timeouts:dict) -> bytes:
+    try:
+        return await asyncio.wait_for(reader.read(size), timeouts['read'])
+    except asyncio.TimeoutError:
+        raise Phase_Timeout('read')
+
+
+
+async def close_connection(writer:asyncio.StreamWriter) -> None:
+    writer.close()
+    try:   await asyncio.wait_for(writer.wait_closed(), 1)
+    except (asyncio.TimeoutError, OSError, ssl.SSLError): return
+
+
+
+
 # FUNCTIONS ==================================================================================================
 
-def ftp_banner_grabbing(host:str, port:int) -> None:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.settimeout(5)
-        sock.connect((host, port))
+async def ftp_banner_grabbing(host:str, port:int, timeouts:dict, **_) -> dict:
+    reader, writer = await open_connection(host, port, timeouts)
+    try:
+        banner:str = (await read_response(reader, 1024, timeouts)).decode('utf-8', errors='ignore').strip()
+        return banner_result(host, port, 'ftp', [banner] if banner else [])
+    finally:
+        await close_connection(writer)
+
+
+
+async def ssh_banner_grabbing(host:str, port:int, timeouts:dict, **_) -> dict:
+    reader, writer = await open_connection(host, port, timeouts)
+    try:
+        banner:str = (await read_response(reader, 1024, timeouts)).decode(errors='ignore')
+        return banner_result(host, port, 'ssh', [line.strip() for line in banner.split(',') if line.strip()])
+    finally:
+        await close_connection(writer)
+
+
+
+async def http_banner_grabbing(host:str, port:int, timeouts:dict, paths:list[str]=None, **_) -> dict:
+    paths:list     = paths or ['/']
+    responses:list = []
+
+    while len(responses) < len(paths):
+        reader, writer = await open_connection(host, port, timeouts)
+        try:
+            received:list = await http_exchange(reader, writer, host, paths[len(responses):], timeouts)
+        finally:
+            await close_connection(writer)
+
+        if not received: break
+        responses.extend(received)
+
+    return banner_result(host, port, 'http', http_response_lines(paths, responses))
+
+
+
+async def http_exchange(reader:asyncio.StreamReader, writer:asyncio.StreamWriter, host:str, paths:list[str], timeouts:dict) -> list[dict]:
+    parser:HTTP_Response_Parser = HTTP_Response_Parser()
+    responses:list              = []
+
+    for batch in (paths[:1], paths[1:]):
+        if not batch or (responses and not responses[-1]['keep_alive']): break
+
+        for _ in batch: parser.expect('HEAD')
+        writer.write(b''.join(http_request('HEAD', host, path) for path in batch))
+
+        while parser.pending:
+            try:   data:bytes = await read_response(reader, 4096, timeouts)
+            except Phase_Timeout:
+                if responses: return responses
+                raise
+
+            if not data: return responses + parser.finish()
+            responses.extend(parser.feed(data))
+
+    return responses
+
+
+
+async def https_banner_grabbing(host:str, port:int, timeouts:dict, tls_cache:TLS_Cache=None, server_name:str=None, paths:list[str]=None,
+                                executor:ThreadPoolExecutor=None, **_) -> dict:
+    tls_cache:TLS_Cache = tls_cache or TLS_Cache()
+    server_name:str     = server_name or host
+    paths:list          = paths or ['/']
+    cached:list         = tls_cache.get_banner(host, port, server_name, paths)
+
+    if cached:
+        return banner_result(host, port, 'https', [f'SNI: {server_name} (cached)'] + cached)
+
+    lines:list = await asyncio.get_running_loop().run_in_executor(
+        executor, https_request, host, port, server_name, paths, timeouts, tls_cache
+    )
+    return banner_result(host, port, 'https', lines)
+
+
+
+def tls_executor(concurrency:int) -> ThreadPoolExecutor:
+    # The blocking TLS handshakes would be capped by the default executor (min(32, CPUs + 4) threads): one
+    # thread per allowed connection, started only when a handshake needs it
+    return ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='tls')
+
+
+
+def https_request(host:str, port:int, server_name:str, paths:list[str], timeouts:dict, tls_cache:TLS_Cache) -> list[str]:
+    responses:list   = []
+    certificate:dict = None
+    resumed:str      = ''
+
+    while len(responses) < len(paths):
+        with tls_connection(host, port, server_name, timeouts, tls_cache) as ssock:
+            if not responses:
+                certificate = decode_certificate(ssock.getpeercert(binary_form=True) or b'')
+                resumed     = ' (resumed session)' if ssock.session_reused else ''
+
+            received:list = https_exchange(ssock, server_name, paths[len(responses):], timeouts)
+            tls_cache.store_session(host, port, server_name, ssock.session)
+
+        if not received: break
+        responses.extend(received)
+
+    lines:list = certificate_lines(certificate) + http_response_lines(paths, responses)
+    tls_cache.store_banner(host, port, server_name, paths, lines, certificate['notAfter'] if certificate else None)
+    return [f'SNI: {server_name}{resumed}'] + lines
+
+
+
+def tls_connection(host:str, port:int, server_name:str, timeouts:dict, tls_cache:TLS_Cache) -> ssl.SSLSocket:
+    try:
+        sock:socket.socket = socket.create_connection((host, port), timeout=timeouts['connect'])
+    except socket.timeout:
+        raise Phase_Timeout('connect')
+
+    try:
+        session:ssl.SSLSession = tls_cache.get_session(host, port, server_name)
+        return tls_cache.context.wrap_socket(sock, server_hostname=server_name, session=session)
+    except socket.timeout:
+        sock.close()
+        raise Phase_Timeout('handshake')
+    except Exception:
+        sock.close()
+        raise
+
+
+
+def https_exchange(ssock:ssl.SSLSocket, server_name:str, paths:list[str], timeouts:dict) -> list[dict]:
+    parser:HTTP_Response_Parser = HTTP_Response_Parser()
+    responses:list              = []
+    ssock.settimeout(timeouts['read'])
 
-        banner = sock.recv(1024).decode('utf-8').strip()
+    for batch in (paths[:1], paths[1:]):
+        if not batch or (responses and not responses[-1]['keep_alive']): break
 
-        if banner: print(f'[+] FTP Banner de {host}:{port} -> {banner}')
-        else:      print(f'[-] Nenhum banner recebido de {host}:{port}')
+        for _ in batch: parser.expect('GET')
+        ssock.sendall(b''.join(http_request('GET', server_name, path) for path in batch))
 
+        while parser.pending:
+            try:   data:bytes = ssock.recv(4096)
+            except socket.timeout:
+                if responses: return responses
+                raise Phase_Timeout('read')
 
+            if not data: return responses + parser.finish()
+            responses.extend(parser.feed(data))
 
-def ssh_banner_grabbing(host:str, port:int) -> None:
-    with socket.create_connection((host, port), timeout=5) as sock:
-        banner = sock.recv(1024).decode(errors="ignore")
-        banner = banner.split(',')
-        print(f'[+] SSH server banner')
-        for line in banner:
-            if not line == '': print(f'  - {line.strip()}')
+    return responses
 
 
 
-def http_banner_grabbing(host:str, port:int) -> None:
-    with socket.create_connection((host, port), timeout=5) as sock:
-        request = f'HEAD / HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'
-        sock.send(request.encode())
-        response = sock.recv(4096).decode(errors='ignore')
+def http_response_lines(paths:list[str], responses:list[dict]) -> list[str]:
+    lines:list = []
 
-        print('[+] HTTP server response:')
-        for line in response.split("\r\n"):
-            if line == '': continue
-            print(line)
+    for path, response in zip(paths, responses):
+        prefix:str = f'[{path}] ' if len(paths) > 1 else ''
+        lines.append(f'{prefix}{response["status_line"]}')
+        lines.extend(header for header in response['headers'] if header != '')
 
+    for path in paths[len(responses):]:
+        lines.append(f'[{path}] No response')
 
+    return lines
 
-def https_banner_grabbing(host:str, port:int) -> None:
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_NONE
 
-    with socket.create_connection((host, port)) as sock:
-        with context.wrap_socket(sock, server_hostname=host) as ssock:            
-            cert = ssock.getpeercert()
 
-            if cert:
-                print(f'[+] {host} SSL Certificate:')
-                for field, value in cert.items():
-                    print(f'{field}: {value}')
-            else:
-                print('No SSL certificates returned')
+def certificate_lines(certificate:dict|None) -> list[str]:
+    if not certificate:
+        return ['No SSL certificates returned']
 
-            print('HTTP header (if present):')
-            ssock.send(b'GET / HTTP/1.1\r\nHost: ' + host.encode() + b'\r\n\r\n')
-            response = ssock.recv(1024)
-            for line in response.decode(errors='ignore').split("\r\n"):
-                if line == '': continue
-                print(line)
\ No newline at end of file
+    lines:list = []
+    for field, value in certificate.items():
+        if field in ('notBefore', 'notAfter'):
+            value = time.strftime('%b %d %H:%M:%S %Y GMT', time.gmtime(value))
+        lines.append(f'{field}: {value}')
+    return lines
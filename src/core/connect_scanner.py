@@ -0,0 +1,119 @@
+import errno
+import resource
+import selectors
+import socket
+import struct
+import time
+from collections import deque
+from models.data import Data
+
+
+class Connect_Scanner:
+
+    _LINGER_RESET:bytes = struct.pack('ii', 1, 0)
+    _RESERVED_FILES:int = 64
+
+    __slots__ = ('_data', '_max_in_flight', '_timeout', '_selector', '_deadlines')
+
+    def __init__(self, data:Data, max_in_flight:int=1000, timeout:float=1.0) -> None:
+        self._data:Data                       = data
+        self._max_in_flight:int               = self._raise_file_limit(max_in_flight)
+        self._timeout:float                   = timeout
+        self._selector:selectors.BaseSelector = None
+        self._deadlines:deque                 = deque()
+
+
+
+    @classmethod
+    def _raise_file_limit(cls, max_in_flight:int) -> int:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        needed:int = max_in_flight + cls._RESERVED_FILES
+        if soft != resource.RLIM_INFINITY and soft < needed:
+            soft:int = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        return max(1, min(max_in_flight, soft - cls._RESERVED_FILES))
+
+
+
+    def scan(self, target_ip:str, ports:list[int], on_open:callable=None) -> None:
+        waiting:deque = deque(ports)
+
+        with selectors.DefaultSelector() as self._selector:
+            while waiting or self._selector.get_map():
+                while waiting and len(self._selector.get_map()) < self._max_in_flight:
+                    if not self._connect(target_ip, waiting[0], on_open): break
+                    waiting.popleft()
+
+                for key, _ in self._selector.select(self._next_timeout()):
+                    result:int = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    self._finish(key.fileobj, target_ip, key.data, result, on_open)
+
+                self._expire_connections()
+
+
+
+    def _connect(self, target_ip:str, port:int, on_open:callable) -> bool:
+        try:
+            sock:socket.socket = self._data.transport.tcp_socket()
+        except OSError as error:
+            return self._handle_resource_error(error)
+
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, self._LINGER_RESET)
+        result:int = sock.connect_ex((target_ip, port))
+        self._data.metrics.count('probes_sent')
+
+        if result == errno.EINPROGRESS:
+            self._selector.register(sock, selectors.EVENT_WRITE, port)
+            self._deadlines.append((time.monotonic() + self._timeout, sock))
+        elif result == errno.EADDRNOTAVAIL:
+            sock.close()
+            return self._handle_resource_error(OSError(result, 'No local ports left'))
+        else:
+            self._finish(sock, target_ip, port, result, on_open, registered=False)
+        return True
+
+
+
+    def _handle_resource_error(self, error:OSError) -> bool:
+        if error.errno not in (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL) or not self._selector.get_map():
+            raise error
+
+        self._max_in_flight = max(1, len(self._selector.get_map()))
+        self._data.metrics.count('in_flight_reduced')
+        return False
+
+
+
+    def _next_timeout(self) -> float:
+        if not self._deadlines: return 0
+        return max(0, self._deadlines[0][0] - time.monotonic())
+
+
+
+    def _finish(self, sock:socket.socket, target_ip:str, port:int, result:int, on_open:callable, registered:bool=True) -> None:
+        if registered: self._selector.unregister(sock)
+        sock.close()
+        self._data.metrics.count('ports_checked')
+
+        match result:
+            case 0:
+                self._data.add_packet_info('TCP', (target_ip, port, 'OPENED'))
+                if on_open: on_open(port)
+            case errno.ECONNREFUSED:
+                self._data.add_packet_info('TCP', (target_ip, port, 'Closed'))
+            case _:
+                self._data.metrics.count('connect_errors')
+
+
+
+    def _expire_connections(self) -> None:
+        now:float = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, sock = self._deadlines.popleft()
+            if sock.fileno() == -1: continue
+
+            self._selector.unregister(sock)
+            sock.close()
+            self._data.metrics.count('ports_checked')
+            self._data.metrics.count('connect_timeouts')
@@ -0,0 +1,339 @@
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+from queue          import Queue, Empty
+from threading      import Event, Lock
+from api            import scan_ports
+from models.data    import Data
+from utils.port_set import Port_Set
+
+
+class Shard_Error(Exception): ...
+
+
+
+def parse_address(address:str) -> tuple[int, str|tuple[str, int]]:
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[5:]
+
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '0.0.0.0', int(port))
+
+
+
+def send_message(stream, message:dict) -> None:
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+
+def read_message(stream) -> dict:
+    line:bytes = stream.readline()
+    if not line:
+        raise ConnectionError('Connection closed')
+    return json.loads(line)
+
+
+
+
+# COORDINATOR ================================================================================================
+
+class Scan_Coordinator:
+
+    FORWARDED_OPTIONS:tuple = ('protocol', 'random', 'delay', 'connect', 'max_in_flight', 'connect_timeout')
+    SHARD_RETRIES:int       = 3
+
+    __slots__ = ('_data', '_shards', '_pending', '_retries', '_results', '_options', '_lock', '_finished')
+
+    def __init__(self, data:Data) -> None:
+        self._data:Data      = data
+        self._shards:Queue   = Queue()
+        self._pending:int    = 0
+        self._retries:dict   = {}
+        self._results:dict   = {}
+        self._options:dict   = {}
+        self._lock:Lock      = Lock()
+        self._finished:Event = Event()
+
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+
+    def execute(self) -> None:
+        try:
+            self._options = self._scan_options()
+            self._create_shards()
+            self._serve()
+            self._display_result()
+        except KeyboardInterrupt:  print('Process stopped')
+        except Exception as error: print(f'ERROR: {error}')
+
+
+
+    def _create_shards(self) -> None:
+        ports:list[int] = Port_Set.get_ports(
+            self._data.arguments['ports'] or self._data.arguments['protocol'], self._data.arguments['protocol'], self._data.arguments['top_ports']
+        )
+        size:int        = self._data.arguments['shard_size']
+
+        for target in self._expand_targets(self._data.arguments['targets']):
+            for start in range(0, len(ports), size):
+                self._shards.put({'id': self._pending, 'target': target, 'ports': ports[start : start + size]})
+                self._pending += 1
+
+        print(f'{self._pending} shards waiting for workers on {self._data.arguments["listen"]}')
+
+
+
+    @staticmethod
+    def _expand_targets(targets:list[str]) -> list[str]:
+        expanded:list = []
+        for target in targets:
+            try:
+                network:ipaddress.IPv4Network = ipaddress.IPv4Network(target, strict=False)
+                expanded.extend(str(ip) for ip in (network.hosts() if network.num_addresses > 1 else network))
+            except ValueError:
+                expanded.append(target)
+        return expanded
+
+
+
+    def _serve(self) -> None:
+        family, address = parse_address(self._data.arguments['listen'])
+        server_class    = socketserver.ThreadingUnixStreamServer if family == socket.AF_UNIX else socketserver.ThreadingTCPServer
+        coordinator     = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                coordinator._handle_worker(self.connection, self.rfile, self.wfile)
+
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
+
+        server_class.allow_reuse_address = True
+        server_class.daemon_threads      = False
+        with server_class(address, Handler) as server:
+            with self._data.metrics.stage('distributed'):
+                server.timeout = 0.5
+                while not self._finished.is_set():
+                    server.handle_request()
+
+
+
+    def _handle_worker(self, connection:socket.socket, reader, writer) -> None:
+        connection.settimeout(self._data.arguments['shard_timeout'])
+        try:
+            worker:str = read_message(reader).get('name', 'worker')
+        except (OSError, ValueError):
+            return
+        print(f'[+] {worker} connected')
+
+        while not self._finished.is_set():
+            try:
+                shard:dict = self._shards.get(timeout=0.5)
+            except Empty:
+                continue
+
+            try:
+                send_message(writer, {'type': 'shard', 'options': self._options, **shard})
+                self._read_shard_results(reader)
+            except Shard_Error as error:
+                if self._retry_shard(shard):
+                    print(f'[-] Shard {shard["id"]} ({shard["target"]}) failed on {worker}: {error}, shard queued again')
+                    continue
+                print(f'[-] Shard {shard["id"]} ({shard["target"]}) failed on {worker}: {error}, dropped after {self.SHARD_RETRIES} retries')
+                self._complete_shard(failed=True)
+                continue
+            except (OSError, ValueError) as error:
+                self._shards.put(shard)
+                self._data.metrics.count('shards_reassigned')
+                print(f'[-] {worker} failed on shard {shard["id"]} ({error}), shard queued again')
+                return
+
+            self._complete_shard()
+
+        try:   send_message(writer, {'type': 'stop'})
+        except OSError: pass
+
+
+
+    def _scan_options(self) -> dict:
+        options:dict = {name: self._data.arguments[name] for name in self.FORWARDED_OPTIONS}
+        options['simulate'] = None
+
+        if self._data.arguments['simulate']:
+            with open(self._data.arguments['simulate'], 'r') as file:
+                options['simulate'] = json.load(file)
+        return options
+
+
+
+    def _read_shard_results(self, reader) -> None:
+        while (message := read_message(reader))['type'] == 'result':
+            self._record_result(message['ip'], message['port'], message['status'])
+
+        match message['type']:
+            case 'done':  return
+            case 'error': raise Shard_Error(message['error'])
+            case _:       raise ValueError(f'Unexpected message: {message["type"]}')
+
+
+
+    def _record_result(self, ip:str, port:int, status:str) -> None:
+        with self._lock:
+            ports:dict = self._results.setdefault(ip, {})
+            if ports.get(port) == status: return
+
+            ports[port] = status
+            if self._data.writer is not None:
+                self._data.writer.write({'protocol': self._data.arguments['protocol'], 'ip': ip, 'port': port, 'status': status})
+
+
+
+    def _retry_shard(self, shard:dict) -> bool:
+        with self._lock:
+            retries:int = self._retries.get(shard['id'], 0)
+            if retries >= self.SHARD_RETRIES: return False
+            self._retries[shard['id']] = retries + 1
+
+        self._shards.put(shard)
+        self._data.metrics.count('shards_retried')
+        return True
+
+
+
+    def _complete_shard(self, failed:bool=False) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._data.metrics.count('shards_failed' if failed else 'shards_completed')
+            if self._pending == 0:
+                self._finished.set()
+
+
+
+    def _display_result(self) -> None:
+        opened:tuple = ('OPENED', 'POTENTIALLY OPENED')
+
+        for ip, ports in sorted(self._results.items()):
+            open_ports:list = sorted(port for port, status in ports.items() if status in opened)
+            if not open_ports: continue
+
+            print(f'>> IP: {ip}')
+            for port in open_ports:
+                print(f'Status: {ports[port]} -> {port:>5} - {Port_Set.get_tcp_port_description(port)}')
+
+        print(f'Hosts with open ports: {sum(1 for ports in self._results.values() if set(ports.values()) & set(opened))}')
+
+
+
+
+# WORKER =====================================================================================================
+
+class Shard_Stream:
+
+    __slots__ = ('_stream', '_ports', '_sent', '_lock')
+
+    def __init__(self, stream, ports:list[int]) -> None:
+        self._stream    = stream
+        self._ports:set = set(ports)
+        self._sent:set  = set()
+        self._lock:Lock = Lock()
+
+
+
+    # Used as the result writer of the scan, so every port is sent to the coordinator as soon as it resolves
+    def write_response(self, protocol:str, info:tuple, ip:str=None) -> None:
+        match protocol:
+            case 'TCP': self.send(*info)
+            case 'UDP': self.send(ip, info, 'CLOSED')
+
+
+
+    def send(self, ip:str, port:int, status:str) -> None:
+        with self._lock:
+            if port not in self._ports or port in self._sent: return
+            self._sent.add(port)
+            send_message(self._stream, {'type': 'result', 'ip': ip, 'port': port, 'status': status})
+
+
+
+    def close(self) -> None: ...
+
+
+
+
+class Scan_Worker:
+
+    __slots__ = ('_data', '_transports')
+
+    def __init__(self, data:Data) -> None:
+        self._data:Data       = data
+        self._transports:dict = {}
+
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+
+    def execute(self) -> None:
+        try:
+            self._work()
+        except KeyboardInterrupt:  print('Process stopped')
+        except Exception as error: print(f'ERROR: {error}')
+
+
+
+    def _work(self) -> None:
+        family, address = parse_address(self._data.arguments['coordinator'])
+
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.connect(address)
+            reader, writer = sock.makefile('rb'), sock.makefile('wb')
+            send_message(writer, {'type': 'hello', 'name': f'{socket.gethostname()}:{os.getpid()}'})
+
+            while (shard := read_message(reader))['type'] == 'shard':
+                self._scan_shard(shard, writer)
+
+
+
+    def _scan_shard(self, shard:dict, writer) -> None:
+        options:dict        = dict(shard['options'])
+        stream:Shard_Stream = Shard_Stream(writer, shard['ports'])
+        transport:object    = self._get_transport(options.pop('simulate', None))
+        try:
+            result = scan_ports(
+                shard['target'], shard['ports'], options, resolver=None if transport else self._data.resolver,
+                transport=transport, writer=stream
+            )
+        except Exception as error:
+            send_message(writer, {'type': 'error', 'error': str(error)})
+            return
+
+        for port, status in result.ports.items():
+            stream.send(result.target, port, status)
+        send_message(writer, {'type': 'done', 'shard': shard['id']})
+        print(f'Shard {shard["id"]}: {shard["target"]} {len(shard["ports"])} ports, {len(result.open_ports)} open')
+
+
+
+    def _get_transport(self, simulation:dict|None) -> object:
+        if simulation is None: return None
+
+        key:str = json.dumps(simulation, sort_keys=True)
+        if key not in self._transports:
+            from transport.simulated_transport import Simulated_Transport
+            self._transports[key] = Simulated_Transport(simulation)
+        return self._transports[key]
@@ -1,31 +1,34 @@
 import time
-import sys
-from models.data        import Data
-from packet.dissector   import Packet_Dissector
-from packet.builder     import Packet_Builder
-from packet.sender      import send_ping, send_layer_3_packet
-from sniffing.sniffer   import Sniffer
-from utils.network_info import get_ip_range, get_host_name
-from utils.type_hints   import Raw_Packet
+from contextlib            import ExitStack
+from itertools             import chain, islice
+from threading             import Thread
+from models.data           import Data
+from packet.dissector      import Packet_Dissector, Live_Dissector
+from packet.builder        import Packet_Builder
+from packet.sender         import send_ping, send_layer_3_packet, send_layer_2_packets
+from utils.os_fingerprint  import OS_Fingerprint
+from utils.route_table     import Route
+from utils.status_reporter import Status_Reporter
+from utils.target_index    import Target_Index
+from utils.type_hints      import Raw_Packet
 
 
 
 class Network_Mapper:
 
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
-
-
+    DEFAULT_PROBES:str = 'echo,timestamp,syn:22/80/443/3389,ack:80,udp:53/161'
+    PROBE_KINDS:tuple  = ('echo', 'timestamp', 'syn', 'ack', 'udp')
 
-    __slots__ = ('_data', '_results')
+    __slots__ = ('_data', '_results', '_sockets', '_groups', '_probes', '_alive', '_display_progress_enabled')
 
-    def __init__(self, data:Data) -> None:
-        self._data:Data    = data
-        self._results:dict = {}
+    def __init__(self, data:Data, display_progress:bool=True) -> None:
+        self._data:Data                     = data
+        self._results:dict                  = {}
+        self._sockets:dict                  = {}
+        self._groups:dict                   = {}
+        self._probes:list                   = []
+        self._alive:set                     = set()
+        self._display_progress_enabled:bool = display_progress
     
 
 
@@ -33,94 +36,371 @@ class Network_Mapper:
         return self
     
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__class__._instance = None
         return False
 
 
 
     def execute(self) -> None:
         try:
-            self._perform_mapping()
-            self._process_packets()
-            self._process_responses()
+            if self._data.arguments['watch']:
+                return self._watch_network()
+
+            self.run()
             self._display_result()
+            self._data.save_history(','.join(self._data.arguments['targets'] or []) or None, hosts=[
+                (ip, info['mac'], '-'.join(sorted(info['protocols']))) for ip, info in self._results.items()
+            ])
         except KeyboardInterrupt:  print('Process stopped')
         except Exception as error: print(f'ERROR: {error}')
 
 
 
+    def run(self) -> dict[str, dict]:
+        self._perform_mapping()
+        with self._data.metrics.stage('dissecting'):
+            self._process_packets(self._display_progress_enabled)
+        self._process_responses()
+        return self._results
+
+
+
     def _perform_mapping(self) -> None:
-        with Sniffer(self._data, 'TCP-ICMP') as sniffer:
-            self._send_packets()
-            time.sleep(3)
-            sniffer.stop_sniffing()
+        self._prepare_targets()
+        self._probes = self._parse_probes(self._data.arguments['probes'] or self.DEFAULT_PROBES)
+
+        with ExitStack() as stack:
+            sniffers:list = [
+                stack.enter_context(self._data.transport.sniffer(self._data, self._get_filter_name(), interface))
+                for interface in self._groups
+            ]
+            try:
+                self._open_sockets()
+                with Live_Dissector(self._data, on_dissected=self._mark_alive_hosts):
+                    self._send_to_all_interfaces(
+                        {interface: ips for interface, (_, ips) in self._groups.items()}, self._display_progress_enabled
+                    )
+                    with self._data.metrics.stage('waiting'): self._data.transport.wait(self._get_wait_time())
+            finally:
+                for sniffer in sniffers: sniffer.stop_sniffing()
+                self._close_sockets()
+
+
+
+    def _prepare_targets(self) -> None:
+        index:Target_Index = Target_Index.from_specs(
+            self._read_target_specs(), self._read_specs_file('exclude_file'), self._data.resolver
+        )
+
+        with self._data.metrics.stage('interface'):
+            routes:dict = index.split(self._data.transport.route)
+
+        for route, route_index in routes.items():
+            if self._data.arguments['arp'] and route.gateway:
+                print(f'[WARNING] {len(route_index)} addresses are behind {route.gateway}: ARP requests will not reach them')
+
+            route_index = route_index.subtract(Target_Index.from_specs([route.source]))
+            _, ips      = self._groups.get(route.interface, (route, Target_Index()))
+            self._groups[route.interface] = (route, ips.union(route_index))
+
+        self._data.target_ip = Target_Index(interval for _, ips in self._groups.values() for interval in ips.intervals())
+
+
+
+    @classmethod
+    def _parse_probes(cls, probes:str) -> list[tuple[str, int|None]]:
+        parsed:list = []
+        for probe in probes.split(','):
+            kind, _, ports = probe.strip().lower().partition(':')
+            if kind not in cls.PROBE_KINDS:
+                raise ValueError(f'Unknown probe: {probe} (use {", ".join(cls.PROBE_KINDS)})')
+
+            if kind in ('echo', 'timestamp'):
+                if ports: raise ValueError(f'ICMP probes take no ports: {probe}')
+                parsed.append((kind, None))
+                continue
+
+            if not ports: raise ValueError(f'Give the ports of the probe: {probe} (e.g. {kind}:80/443)')
+            for port in ports.split('/'):
+                if not port.isdigit() or not 1 <= int(port) <= 65535:
+                    raise ValueError(f'Invalid port in probe: {probe}')
+                parsed.append((kind, int(port)))
+        return parsed
+
+
+
+    def _read_target_specs(self) -> iter:
+        if not self._data.arguments['targets'] and not self._data.arguments['targets_file']:
+            return [self._data.transport.local_network()]
+        return chain(self._data.arguments['targets'] or [], self._read_specs_file('targets_file'))
+
+
+
+    def _read_specs_file(self, argument:str) -> iter:
+        path:str = self._data.arguments[argument]
+        return Target_Index.read_file(path) if path else ()
+
+
+
+    def _get_filter_name(self) -> str:
+        return 'ARP' if self._data.arguments['arp'] else 'DISCOVERY'
+
+
+
+    def _get_wait_time(self) -> int:
+        return 1 if self._data.arguments['arp'] else 3
+
+
+
+    def _open_sockets(self) -> None:
+        for interface in self._groups:
+            if self._data.arguments['arp']:
+                self._sockets[interface] = {'layer_2': self._data.transport.layer_2_socket(interface)}
+            else:
+                self._sockets[interface] = {
+                    'icmp':    self._data.transport.icmp_socket(interface),
+                    'layer_3': self._data.transport.layer_3_socket(interface)
+                }
+
+
+
+    def _close_sockets(self) -> None:
+        while self._sockets:
+            _, sockets = self._sockets.popitem()
+            for sock in sockets.values(): sock.close()
+
+
+
+    def _send_to_all_interfaces(self, targets:dict[str, list[str]], display_progress:bool=True) -> None:
+        probes_per_host:int      = 1 if self._data.arguments['arp'] else len(self._probes)
+        threads:list[Thread]     = [Thread(target=self._send_probes, args=(interface, ips)) for interface, ips in targets.items()]
+        reporter:Status_Reporter = Status_Reporter(
+            self._data.metrics, probes_per_host * sum(map(len, targets.values())), enabled=display_progress
+        )
+        with self._data.metrics.stage('sending'), reporter:
+            for thread in threads: thread.start()
+            for thread in threads: thread.join()
+
+
+
+    def _send_probes(self, interface:str, targets:iter) -> None:
+        if self._data.arguments['arp']:
+            self._send_arp_requests(interface, targets)
+        else:
+            self._send_packets(interface, targets)
     
 
 
-    def _send_packets(self) -> None:
-        self._data.target_ip   = get_ip_range()
-        total_ips:int          = len(self._data.target_ip)
-        icmp_packet:Raw_Packet = Packet_Builder().build_packet('ICMP')
-        
-        for index ,ip in enumerate(self._data.target_ip, start=1):
-            tcp_packet:Raw_Packet = Packet_Builder.build_packet('TCP', ip, 80)
-            send_ping(icmp_packet, ip)
-            send_layer_3_packet(tcp_packet, ip, 80)
-            self._display_progress(index, total_ips)
-            time.sleep(0.04)
-        
-        sys.stdout.write('\n')
+    def _send_packets(self, interface:str, targets:iter) -> None:
+        batch_size:int = 64
+        interval:float = batch_size / self._data.arguments['rate']
+        sent:int       = 0
+
+        for kind, port in self._probes:
+            for ip in targets:
+                if ip in self._alive:
+                    self._data.metrics.count('probes_skipped')
+                    continue
+
+                self._send_probe(interface, kind, ip, port)
+                sent += 1
+                if sent % batch_size == 0: self._data.transport.pace(interval)
+
+
+
+    def _send_probe(self, interface:str, kind:str, ip:str, port:int|None) -> None:
+        route:Route  = self._groups[interface][0]
+        sockets:dict = self._sockets[interface]
+        self._data.metrics.count('probes_built')
+
+        match kind:
+            case 'echo'|'timestamp':
+                self._send(send_ping, Packet_Builder.build_packet('ICMP', kind), ip, sockets['icmp'])
+            case 'syn'|'ack':
+                packet:Raw_Packet = Packet_Builder.build_packet(
+                    'TCP', ip, port, source=route.packed_source, flags=0x02 if kind == 'syn' else 0x10
+                )
+                self._send(send_layer_3_packet, packet, ip, port, sockets['layer_3'])
+            case 'udp':
+                packet:Raw_Packet = Packet_Builder.build_packet('UDP', ip, port, source=route.packed_source)
+                self._send(send_layer_3_packet, packet, ip, port, sockets['layer_3'])
+
+
+
+    def _send_arp_requests(self, interface:str, targets:iter) -> None:
+        batch_size:int = 64
+        targets:iter   = iter(targets)
+
+        while batch := list(islice(targets, batch_size)):
+            frames:list[Raw_Packet] = [Packet_Builder.build_packet('ARP', ip, interface=interface) for ip in batch]
+            self._data.metrics.count('probes_built', len(frames))
+            self._send(send_layer_2_packets, frames, interface, self._sockets[interface]['layer_2'], probes=len(frames))
+            self._data.transport.pace(0.01)
 
 
     
-    @staticmethod
-    def _display_progress(index:int, total:int) -> None:
-        sys.stdout.write(f'\rPackets sent: {index}/{total}')
-        sys.stdout.flush()
+    def _send(self, send_function:callable, *args, probes:int=1) -> None:
+        try:
+            send_function(*args)
+            self._data.metrics.count('probes_sent', probes)
+        except OSError:
+            self._data.metrics.count('send_errors', probes)
 
 
 
-    def _process_packets(self) -> None:
+    def _process_packets(self, display_progress:bool=True) -> None:
         with Packet_Dissector(self._data) as dissector:
-            dissector.dissect_packets()
+            dissector.dissect_packets(display_progress)
+
+
+
+    def _mark_alive_hosts(self) -> None:
+        for protocol in ('ICMP', 'TCP', 'UDP'):
+            self._alive.update(info[0] for info in self._data.responses[protocol])
 
     
 
     def _process_responses(self) -> None:
+        if self._data.responses['ARP']:
+            self._process_arp_responses()
+
         if self._data.responses['ICMP']:
             self._process_icmp_reponses()
         
         if self._data.responses['TCP']:
             self._process_tcp_responses()
 
+        if self._data.responses['UDP']:
+            self._process_udp_responses()
+
+        for ip, info in self._results.items():
+            info['os'] = OS_Fingerprint.guess(self._data.fingerprints.get(ip)) or 'Unknown'
+
+
+    
+    def _process_arp_responses(self) -> None:
+        while self._data.responses['ARP']:
+            ip, mac_addr = self._data.responses['ARP'].pop()
+            self._add_result(ip, mac_addr, 'ARP')
+
 
     
     def _process_icmp_reponses(self) -> None:
         while self._data.responses['ICMP']:
-            ip, mac_addr      = self._data.responses['ICMP'].pop()
-            self._results[ip] = {'mac': mac_addr, 'protocols': ['ICMP']}
+            ip, mac_addr = self._data.responses['ICMP'].pop()
+            self._add_result(ip, mac_addr, 'ICMP')
 
 
     
     def _process_tcp_responses(self) -> None:
         while self._data.responses['TCP']:
             ip, _, _ = self._data.responses['TCP'].pop()
+            self._add_result(ip, 'Unknown', 'TCP')
+
+
+    
+    def _process_udp_responses(self) -> None:
+        while self._data.responses['UDP']:
+            ip, mac_addr = self._data.responses['UDP'].pop()
+            self._add_result(ip, mac_addr, 'UDP')
 
-            if ip not in self._results:
-                self._results[ip] = {'mac': 'Unknown', 'protocols': ['TCP']}
-                continue
 
-            self._results[ip]['protocols'].append('TCP')
+
+    def _add_result(self, ip:str, mac_addr:str, protocol:str) -> None:
+        host:dict = self._results.setdefault(ip, {'mac': mac_addr, 'protocols': []})
+        if host['mac'] == 'Unknown': host['mac'] = mac_addr
+        if protocol not in host['protocols']: host['protocols'].append(protocol)
 
 
 
     def _display_result(self) -> None:
-        print(f'IP Address{7*" "}MAC Address{8*" "}Protocols  Hostname')
-        print(f'{"-" * 15}  {"-" * 17}  {"-" * 9}  {"-" * 8}')
+        print(f'{"IP Address":<15}  {"MAC Address":<17}  {"Protocols":<16}  {"OS":<24}  Hostname')
+        print(f'{"-" * 15}  {"-" * 17}  {"-" * 16}  {"-" * 24}  {"-" * 8}')
+        with self._data.metrics.stage('resolving'):
+            host_names:dict = self._data.resolver.reverse(list(self._results))
         
         for ip, info in self._results.items():
             protocols:str   = '-'.join(sorted(info['protocols']))
             mac_address:str = info['mac']
         
-            print(f'{ip:<16} {mac_address:<18} {protocols:<11}{get_host_name(ip)}')
-        print(f'Total: {len(self._results)} active hosts')
\ No newline at end of file
+            print(f'{ip:<15}  {mac_address:<17}  {protocols:<16}  {info["os"]:<24}  {host_names[ip]}')
+        print(f'Total: {len(self._results)} active hosts')
+
+
+
+    # WATCH MODE =============================================================================================
+
+    def _watch_network(self) -> None:
+        self._prepare_targets()
+        self._probes = self._parse_probes(self._data.arguments['probes'] or self.DEFAULT_PROBES)
+        interval:float   = self._data.arguments['watch']
+        known_hosts:dict = {}
+        sweep:int        = 0
+        print(f'Watching {len(self._data.target_ip)} addresses every {interval}s (Ctrl+C to stop)')
+
+        with ExitStack() as stack:
+            sniffers:list = [
+                stack.enter_context(self._data.transport.sniffer(self._data, self._get_filter_name(), interface))
+                for interface in self._groups
+            ]
+            try:
+                self._open_sockets()
+                while True:
+                    targets:dict = self._get_watch_targets(known_hosts, sweep)
+                    self._send_to_all_interfaces(targets, display_progress=False)
+                    self._data.transport.wait(self._get_wait_time())
+                    self._process_packets(display_progress=False)
+                    self._results = {}
+                    self._process_responses()
+                    self._report_changes(known_hosts, chain.from_iterable(targets.values()))
+                    sweep += 1
+                    time.sleep(interval)
+            finally:
+                for sniffer in sniffers: sniffer.stop_sniffing()
+                self._close_sockets()
+
+
+
+    def _get_watch_targets(self, known_hosts:dict, sweep:int) -> dict[str, list[str]]:
+        recheck_every:int = 3
+        if sweep % recheck_every == 0:
+            return {interface: ips for interface, (_, ips) in self._groups.items()}
+        return {interface: [ip for ip in ips if ip not in known_hosts] for interface, (_, ips) in self._groups.items()}
+
+
+
+    def _report_changes(self, known_hosts:dict, targets:iter) -> None:
+        now:str         = time.strftime('%H:%M:%S')
+        new_hosts:list  = [ip for ip in self._results if ip not in known_hosts]
+        host_names:dict = self._data.resolver.reverse(new_hosts)
+
+        for ip, info in self._results.items():
+            mac_address:str = info['mac']
+
+            if ip in new_hosts:
+                known_hosts[ip] = {'mac': mac_address, 'missed': 0}
+                print(f'[{now}] [+] {ip:<16} {mac_address:<18} appeared ({host_names[ip]})')
+                continue
+
+            host:dict      = known_hosts[ip]
+            host['missed'] = 0
+
+            if mac_address == 'Unknown': continue
+
+            if host['mac'] not in ('Unknown', mac_address):
+                print(f'[{now}] [*] {ip:<16} MAC changed {host["mac"]} -> {mac_address}')
+            host['mac'] = mac_address
+
+        self._report_missing_hosts(known_hosts, targets, now)
+
+
+
+    def _report_missing_hosts(self, known_hosts:dict, targets:iter, now:str) -> None:
+        missed_limit:int = 2
+
+        for ip in targets:
+            if ip not in known_hosts or ip in self._results: continue
+
+            known_hosts[ip]['missed'] += 1
+            if known_hosts[ip]['missed'] >= missed_limit:
+                print(f'[{now}] [-] {ip:<16} {known_hosts[ip]["mac"]:<18} disappeared')
+                del known_hosts[ip]
\ No newline at end of file
@@ -0,0 +1,173 @@
+from contextlib            import ExitStack, nullcontext
+from itertools             import chain
+from models.data           import Data
+from packet.builder        import Packet_Builder
+from packet.dissector      import Packet_Dissector, Live_Dissector
+from packet.sender         import send_layer_3_packet
+from utils.route_table     import group_by_route
+from utils.status_reporter import Status_Reporter
+from utils.target_index    import Target_Index
+
+
+class Path_Tracer:
+
+    DEFAULT_PORTS:dict = {'UDP': 33434, 'TCP': 80, 'ICMP': 0}
+
+    __slots__ = ('_data', '_groups', '_paths', '_edges', '_display_progress_enabled')
+
+    def __init__(self, data:Data, display_progress:bool=True) -> None:
+        self._data:Data                     = data
+        self._groups:dict                   = {}
+        self._paths:dict                    = {}
+        self._edges:dict                    = {}
+        self._display_progress_enabled:bool = display_progress
+
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+
+    def execute(self) -> None:
+        try:
+            self.run()
+            self._display_result()
+            if self._data.arguments['dot']:
+                self._save_dot_file(self._data.arguments['dot'])
+        except KeyboardInterrupt:  print('Process stopped')
+        except Exception as error: print(f'ERROR: {error}')
+
+
+
+    def run(self) -> tuple[dict[str, list], dict[tuple, int]]:
+        self._trace()
+        with self._data.metrics.stage('dissecting'):
+            with Packet_Dissector(self._data) as dissector:
+                dissector.dissect_packets(self._display_progress_enabled)
+        self._build_paths()
+        self._build_graph()
+        return self._paths, self._edges
+
+
+
+    # PROBES =================================================================================================
+
+    def _trace(self) -> None:
+        self._prepare_targets()
+
+        with ExitStack() as stack:
+            sniffers:list = [
+                stack.enter_context(self._data.transport.sniffer(self._data, 'TRACE', interface))
+                for interface in self._groups
+            ]
+            try:
+                with Live_Dissector(self._data) if self._data.writer else nullcontext():
+                    with self._data.metrics.stage('sending'): self._send_probes()
+                    with self._data.metrics.stage('waiting'): self._data.transport.wait(self._data.arguments['wait'])
+            finally:
+                for sniffer in sniffers: sniffer.stop_sniffing()
+
+
+
+    def _prepare_targets(self) -> None:
+        index:Target_Index = Target_Index.from_specs(
+            chain(self._data.arguments['targets'] or [], self._read_specs_file('targets_file')),
+            self._read_specs_file('exclude_file'), self._data.resolver
+        )
+        self._data.target_ip = list(index)
+
+        with self._data.metrics.stage('interface'):
+            routes:dict = group_by_route(self._data.target_ip, self._data.transport.route)
+
+        for route, ips in routes.items():
+            self._groups.setdefault(route.interface, (route, []))[1].extend(ips)
+
+
+
+    def _read_specs_file(self, argument:str) -> iter:
+        path:str = self._data.arguments[argument]
+        return Target_Index.read_file(path) if path else ()
+
+
+
+    def _send_probes(self) -> None:
+        protocol:str             = self._data.arguments['protocol']
+        port:int                 = self._data.arguments['port'] or self.DEFAULT_PORTS[protocol]
+        max_ttl:int              = self._data.arguments['max_ttl']
+        interval:float           = 1 / self._data.arguments['rate']
+        reporter:Status_Reporter = Status_Reporter(
+            self._data.metrics, max_ttl * len(self._data.target_ip), enabled=self._display_progress_enabled
+        )
+
+        with reporter:
+            for interface, (route, ips) in self._groups.items():
+                with self._data.transport.layer_3_socket(interface) as sock:
+                    for ttl in range(1, max_ttl + 1):
+                        for ip in ips:
+                            packet:bytes = Packet_Builder.build_packet('TRACE', protocol, ip, port, ttl, route.packed_source)
+                            self._data.metrics.count('probes_built')
+                            self._send(packet, ip, port, sock)
+                            self._data.transport.pace(interval)
+
+
+
+    def _send(self, packet:bytes, ip:str, port:int, sock) -> None:
+        try:
+            send_layer_3_packet(packet, ip, port, sock)
+            self._data.metrics.count('probes_sent')
+        except OSError:
+            self._data.metrics.count('send_errors')
+
+
+
+    # TOPOLOGY ===============================================================================================
+
+    def _build_paths(self) -> None:
+        hops:dict = {target: {} for target in self._data.target_ip}
+        for target, ttl, hop in self._data.responses['TRACE']:
+            hops[target][ttl] = hop
+
+        for target, target_hops in hops.items():
+            reached:list = [ttl for ttl, hop in target_hops.items() if hop == target]
+            length:int   = min(reached) if reached else max(target_hops, default=0)
+            self._paths[target] = [target_hops.get(ttl) for ttl in range(1, length + 1)]
+
+
+
+    def _build_graph(self) -> None:
+        for path in self._paths.values():
+            for edge in set(zip(path, path[1:])):
+                if None in edge: continue
+                self._edges[edge] = self._edges.get(edge, 0) + 1
+
+
+
+    # RESULT =================================================================================================
+
+    def _display_result(self) -> None:
+        nodes:set = {hop for path in self._paths.values() for hop in path if hop}
+        with self._data.metrics.stage('resolving'):
+            host_names:dict = self._data.resolver.reverse(list(nodes))
+
+        for target, path in self._paths.items():
+            status:str = f'{len(path)} hops' if path and path[-1] == target else 'not reached'
+            print(f'>> {target} ({status})')
+            for ttl, hop in enumerate(path, start=1):
+                print(f'{ttl:>3}  {hop or "*":<16} {host_names.get(hop, "") if hop else ""}')
+
+        print(f'-- Topology: {len(nodes)} nodes, {len(self._edges)} links --')
+        for (near, far), paths in sorted(self._edges.items(), key=lambda item: item[1], reverse=True):
+            print(f'{near:<16} -> {far:<16} {paths} paths')
+
+
+
+    def _save_dot_file(self, path:str) -> None:
+        with open(path, 'w') as file:
+            file.write('digraph paths {\n')
+            file.writelines(f'    "{near}" -> "{far}" [label={paths}];\n' for (near, far), paths in self._edges.items())
+            file.write('}\n')
+        print(f'Topology saved in {path}')
@@ -1,31 +1,28 @@
 import random
-import time
-import sys
-from models.data        import Data
-from packet.dissector   import Packet_Dissector
-from packet.sender      import send_layer_3_packet
-from packet.builder     import Packet_Builder
-from sniffing.sniffer   import Sniffer
-from utils.network_info import get_host_name
-from utils.port_set     import Port_Set
-from utils.type_hints   import Raw_Packet
+import socket
+from contextlib            import nullcontext
+from core.banner_grabber   import Banner_Pipeline
+from core.connect_scanner  import Connect_Scanner
+from models.data           import Data
+from packet.dissector      import Packet_Dissector, Live_Dissector
+from packet.sender         import send_layer_3_packet
+from packet.builder        import Packet_Builder
+from utils.os_fingerprint  import OS_Fingerprint
+from utils.port_set        import Port_Set
+from utils.route_table     import Route
+from utils.status_reporter import Status_Reporter
+from utils.type_hints      import Raw_Packet
 
 
 
 class Port_Scanner:
     
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
-
-
-    __slots__ = ('_data')
+    __slots__ = ('_data', '_route', '_display_progress_enabled')
 
-    def __init__(self, data:Data) -> None:
-        self._data:Data = data
+    def __init__(self, data:Data, display_progress:bool=True) -> None:
+        self._data:Data                     = data
+        self._route:Route                   = None
+        self._display_progress_enabled:bool = display_progress
 
 
 
@@ -33,24 +30,54 @@ class Port_Scanner:
         return self
     
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__class__._instance = None
         return False
 
 
 
     def execute(self) -> None:
         try:
-            self._prepare_ports()
-            self._send_and_receive()
-            self._process_result()
+            self.run()
             self._display_result()
+            self._data.save_history(self._data.target_ip, ports=[
+                (self._data.target_ip, port, self._data.arguments['protocol'], status)
+                for port, status in self.port_states().items()
+            ])
         except KeyboardInterrupt:  print('Process stopped')
         except Exception as error: print(f'ERROR: {error}')
 
 
 
+    def run(self) -> dict[str, set]:
+        self._prepare_ports()
+        if self._data.arguments.get('connect'):
+            self._connect_to_ports()
+        else:
+            self._send_and_receive()
+            with self._data.metrics.stage('dissecting'): self._process_result()
+        return self._data.responses
+
+
+
+    def port_states(self) -> dict[int, str]:
+        if self._data.arguments['protocol'] == 'UDP':
+            return {
+                port: 'CLOSED' if port in self._data.responses['UDP'] else 'POTENTIALLY OPENED'
+                for port in self._data.target_ports
+            }
+
+        requested:set = set(self._data.target_ports)
+        return {
+            port: status
+            for ip, port, status in self._data.responses['TCP'] if ip == self._data.target_ip and port in requested
+        }
+
+
+
     def _prepare_ports(self) -> None:
-        self._data.target_ports = self._data.arguments['ports'] or self._data.arguments['protocol']
+        self._data.target_ports = Port_Set.get_ports(
+            self._data.arguments['ports'] or self._data.arguments['protocol'],
+            self._data.arguments['protocol'], self._data.arguments['top_ports']
+        )
 
         if self._data.arguments['random']:
             random.shuffle(self._data.target_ports)
@@ -58,34 +85,88 @@ class Port_Scanner:
 
 
     def _send_and_receive(self) -> None:
-        with Sniffer(self._data, self._data.arguments['protocol']) as sniffer:
-            self._send_packets()
-            time.sleep(3)
+        with self._data.metrics.stage('interface'): self._route = self._data.transport.route(self._data.target_ip)
+        with self._data.transport.sniffer(self._data, self._data.arguments['protocol'], self._route.interface) as sniffer:
+            if self._data.arguments['grab'] and self._data.arguments['protocol'] == 'TCP':
+                self._send_packets_and_grab_banners()
+            else:
+                with Live_Dissector(self._data) if self._data.writer else nullcontext():
+                    self._send_packets()
+                    with self._data.metrics.stage('waiting'): self._data.transport.wait(3)
             sniffer.stop_sniffing()
 
 
 
-    def _send_packets(self) -> None:
-        delay_list:list = self._get_delay_time_list()
-        len_ports:int   = len(self._data.target_ports)
-        index:int       = 1
+    def _send_packets_and_grab_banners(self) -> None:
+        queued_ports:set = set()
+
+        with Banner_Pipeline(tls_cache=self._data.tls_cache) as pipeline:
+            with Live_Dissector(self._data, on_dissected=lambda: self._queue_new_opened_ports(pipeline, queued_ports)):
+                self._send_packets()
+                with self._data.metrics.stage('waiting'): self._data.transport.wait(3)
+
 
-        for delay, dst_port in zip(delay_list, self._data.target_ports):
-            packet:Raw_Packet = Packet_Builder.build_packet(self._data.arguments['protocol'], self._data.target_ip, dst_port)
-            send_layer_3_packet(packet, self._data.target_ip, dst_port)
-            
-            self._display_progress(index, len_ports, delay)
-            time.sleep(delay)
-            index += 1
-            
-        sys.stdout.write('\n')
+
+    def _queue_new_opened_ports(self, pipeline:Banner_Pipeline, queued_ports:set) -> None:
+        for ip, port, status in list(self._data.responses['TCP']):
+            if status != 'OPENED' or port in queued_ports: continue
+
+            queued_ports.add(port)
+            self._submit_banner(pipeline, ip, port)
+
+
+
+    @staticmethod
+    def _submit_banner(pipeline:Banner_Pipeline, ip:str, port:int) -> None:
+        protocol:str = Port_Set.get_banner_protocol(port)
+        if protocol: pipeline.submit(protocol, ip, port)
+
+
+
+    def _connect_to_ports(self) -> None:
+        scanner:Connect_Scanner  = Connect_Scanner(
+            self._data, self._data.arguments['max_in_flight'], self._data.arguments['connect_timeout']
+        )
+        reporter:Status_Reporter = Status_Reporter(
+            self._data.metrics, len(self._data.target_ports), 'Ports checked', 'ports_checked',
+            responses=None, drops=('connect_errors', 'connect_timeouts'), enabled=self._display_progress_enabled
+        )
+
+        with self._data.metrics.stage('sending'), reporter:
+            if not self._data.arguments['grab']:
+                return scanner.scan(self._data.target_ip, self._data.target_ports)
+
+            with Banner_Pipeline(tls_cache=self._data.tls_cache) as pipeline:
+                scanner.scan(
+                    self._data.target_ip, self._data.target_ports,
+                    on_open=lambda port: self._submit_banner(pipeline, self._data.target_ip, port)
+                )
+
+
+
+    def _send_packets(self) -> None:
+        delay_list:list          = self._get_delay_time_list()
+        reporter:Status_Reporter = Status_Reporter(
+            self._data.metrics, len(self._data.target_ports), enabled=self._display_progress_enabled
+        )
+
+        with self._data.transport.layer_3_socket(self._route.interface) as sock, self._data.metrics.stage('sending'), reporter:
+            for delay, dst_port in zip(delay_list, self._data.target_ports):
+                packet:Raw_Packet = Packet_Builder.build_packet(
+                    self._data.arguments['protocol'], self._data.target_ip, dst_port, source=self._route.packed_source
+                )
+                self._data.metrics.count('probes_built')
+                self._send_packet(packet, dst_port, sock)
+                self._data.transport.pace(delay)
 
     
     
-    @staticmethod
-    def _display_progress(index:int, len_ports:int, delay:float) -> None:
-        sys.stdout.write(f'\rPackets sent: {index}/{len_ports} >> delay {delay:.2f}')
-        sys.stdout.flush()
+    def _send_packet(self, packet:Raw_Packet, dst_port:int, sock:socket.socket) -> None:
+        try:
+            send_layer_3_packet(packet, self._data.target_ip, dst_port, sock)
+            self._data.metrics.count('probes_sent')
+        except OSError:
+            self._data.metrics.count('send_errors')
 
 
 
@@ -113,12 +194,15 @@ class Port_Scanner:
 
     def _process_result(self) -> None:
         with Packet_Dissector(self._data) as dissector:
-            dissector.dissect_packets()
+            dissector.dissect_packets(self._display_progress_enabled)
 
 
 
     def _display_result(self) -> None:
-        print(f'>> IP: {self._data.target_ip} - Hostname: {get_host_name(self._data.target_ip)}')
+        with self._data.metrics.stage('resolving'):
+            host_name:str = self._data.resolver.reverse([self._data.target_ip])[self._data.target_ip]
+        os_name:str = OS_Fingerprint.guess(self._data.fingerprints.get(self._data.target_ip)) or 'Unknown'
+        print(f'>> IP: {self._data.target_ip} - Hostname: {host_name} - OS: {os_name}')
         open_ports:int = 0
 
         if self._data.responses['TCP']:
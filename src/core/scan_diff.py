@@ -0,0 +1,68 @@
+import time
+from models.data import Data
+
+
+class Scan_Diff:
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data:Data) -> None:
+        self._data:Data = data
+
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+
+    def execute(self) -> None:
+        try:
+            if self._data.arguments['list']:
+                return self._display_scans()
+
+            new_scan:int = self._data.history.resolve_scan_id(self._data.arguments['new'])
+            old_scan:int = self._data.history.resolve_scan_id(
+                self._data.arguments['old'], command=self._data.history.get_command(new_scan)
+            )
+            self._display_diff(old_scan, new_scan, self._data.history.diff(old_scan, new_scan))
+        except KeyboardInterrupt:  print('Process stopped')
+        except Exception as error: print(f'ERROR: {error}')
+
+
+
+    def _display_scans(self) -> None:
+        print(f'{"ID":>5}  Command  Date{17 * " "}Duration  Target')
+        print(f'{"-" * 5}  {"-" * 7}  {"-" * 19}  {"-" * 8}  {"-" * 6}')
+
+        for scan_id, command, target, started, duration in self._data.history.list_scans():
+            date:str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))
+            print(f'{scan_id:>5}  {command:<7}  {date}  {duration:>7.1f}s  {target or "local subnet"}')
+
+
+
+    @staticmethod
+    def _display_diff(old_scan:int, new_scan:int, changes:dict[str, list[tuple]]) -> None:
+        print(f'>> Changes from scan #{old_scan} to scan #{new_scan}')
+
+        for ip, mac in changes['hosts_added']:
+            print(f'[+] {ip:<16} {mac or "Unknown":<18} host appeared')
+        for ip, mac in changes['hosts_removed']:
+            print(f'[-] {ip:<16} {mac or "Unknown":<18} host disappeared')
+        for ip, old_mac, new_mac in changes['mac_changed']:
+            print(f'[*] {ip:<16} MAC changed {old_mac} -> {new_mac}')
+
+        for ip, port, protocol, status in changes['ports_added']:
+            print(f'[+] {ip:<16} {port:>5}/{protocol:<4} {status}')
+        for ip, port, protocol, status in changes['ports_removed']:
+            print(f'[-] {ip:<16} {port:>5}/{protocol:<4} {status} (no longer seen)')
+        for ip, port, protocol, old_status, new_status in changes['status_changed']:
+            print(f'[*] {ip:<16} {port:>5}/{protocol:<4} {old_status} -> {new_status}')
+
+        for ip, port, _, _ in changes['banners_changed']:
+            print(f'[*] {ip:<16} {port:>5}      banner changed')
+
+        print(f'Total: {sum(len(rows) for rows in changes.values())} changes')
@@ -1,8 +1,7 @@
 import sys
+from contextlib          import redirect_stdout
+from importlib           import import_module
 from config.arg_parser   import ArgParser_Manager
-from core.banner_grabber import Banner_Grabber
-from core.network_mapper import Network_Mapper
-from core.port_scanner   import Port_Scanner
 from models.data         import Data
 
 
@@ -10,9 +9,13 @@ class Main:
 
     _data:Data     = Data()
     _commands:dict = {
-        'pscan':  Port_Scanner,
-        'banner': Banner_Grabber,
-        'netmap': Network_Mapper
+        'pscan':  ('core.port_scanner',   'Port_Scanner'),
+        'banner': ('core.banner_grabber', 'Banner_Grabber'),
+        'netmap': ('core.network_mapper', 'Network_Mapper'),
+        'diff':   ('core.scan_diff',      'Scan_Diff'),
+        'coord':  ('core.distributed',    'Scan_Coordinator'),
+        'worker': ('core.distributed',    'Scan_Worker'),
+        'trace':  ('core.path_tracer',    'Path_Tracer')
     }
     
 
@@ -39,26 +42,34 @@ class Main:
 
     @classmethod
     def _verify_if_the_command_exists(cls) -> None:
-        if cls._data.command_name not in cls._commands:
-            print(f'Unknown command: {cls._data.command_name}')
-        
         if cls._data.command_name in ('--help', '-h'):
             cls._display_description(cls._commands)
 
+        if cls._data.command_name not in cls._commands:
+            print(f'Unknown command: {cls._data.command_name}')
+            sys.exit()
+
 
 
     @classmethod
     def _validate_arguments(cls) -> None:
-        if cls._data.command_name!= 'netmap':
-            with ArgParser_Manager(cls._data): ...
+        with cls._data.metrics.stage('parsing'), ArgParser_Manager(cls._data): ...
 
 
 
     @classmethod
     def _run_command(cls) -> None:
-        strategy_class:type = cls._commands.get(cls._data.command_name)
-        with strategy_class(cls._data) as strategy:
-            strategy.execute()
+        module_name, class_name = cls._commands.get(cls._data.command_name)
+        strategy_class:type     = getattr(import_module(module_name), class_name)
+
+        # When the records own stdout, tables, progress and metrics go to stderr until the command ends
+        human_output:object = sys.stderr if cls._data.writer is not None and cls._data.writer.uses_stdout else sys.stdout
+        with redirect_stdout(human_output):
+            with strategy_class(cls._data) as strategy:
+                strategy.execute()
+            cls._data.save_caches()
+            cls._data.close_output()
+            cls._data.metrics.report()
 
 
     
@@ -68,8 +79,8 @@ class Main:
               '> NetXplorer CLI is a tool for network exploration\n'
               'Available commands:')
         
-        for name, class_name in commands.items():
-            command:str   = class_name.__name__.replace('_', ' ')
+        for name, (_, class_name) in commands.items():
+            command:str   = class_name.replace('_', ' ')
             separetor:str = (10 - len(name)) * '.'
             print(f'{name}{separetor}: {command}')
         
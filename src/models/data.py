@@ -1,27 +1,30 @@
-from dataclasses      import dataclass, field
-from socket           import gethostbyname
-from utils.port_set   import Port_Set
-from utils.type_hints import Raw_Packet
+from dataclasses          import dataclass, field
+from utils.dns_resolver   import DNS_Resolver
+from utils.packet_arena   import Packet_Arena
+from utils.port_set       import Port_Set
+from utils.scan_metrics   import Scan_Metrics
+from utils.target_index   import Target_Index
+from utils.type_hints     import Raw_Packet
 
 
 @dataclass(slots=True)
 class Data:
 
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
-
-
-
     command_name:str             = None
     arguments:list               = None
     _target_ip:str               = None 
+    _target_set:frozenset        = frozenset()
     _target_ports:list           = None
     raw_packets:list[Raw_Packet] = field(default_factory=list)
-    _responses:dict[list]        = field(default_factory=lambda: {'TCP':set(), 'UDP':set(), 'ICMP':set()})
+    packet_arena:Packet_Arena    = field(default_factory=Packet_Arena)
+    _responses:dict[list]        = field(default_factory=lambda: {'TCP':set(), 'UDP':set(), 'ICMP':set(), 'ARP':set(), 'TRACE':set()})
+    resolver:DNS_Resolver        = field(default_factory=DNS_Resolver)
+    metrics:Scan_Metrics         = field(default_factory=Scan_Metrics)
+    fingerprints:dict            = field(default_factory=dict)
+    writer:object                = None
+    history:object               = None
+    _tls_cache:object            = None
+    _transport:object            = None
 
 
 
@@ -30,14 +33,23 @@ class Data:
         return self._target_ip
 
     @target_ip.setter
-    def target_ip(self, host_name:str|list) -> None:
-        try:
-            if isinstance(host_name, list):
-                self._target_ip = [gethostbyname(host) for host in host_name]
-            else:
-                self._target_ip = gethostbyname(host_name)
-        except Exception:
-            raise Exception(f'Unknown host: {host_name}')
+    def target_ip(self, host_name:str|list|Target_Index) -> None:
+        if isinstance(host_name, Target_Index):
+            self._target_ip = self._target_set = host_name
+            return
+
+        host_names:list = host_name if isinstance(host_name, list) else [host_name]
+        addresses:dict  = self.resolver.forward(host_names)
+        unknown:list    = [host for host in host_names if addresses[host] is None]
+
+        if unknown:
+            raise Exception(f'Unknown host: {", ".join(unknown)}')
+
+        if isinstance(host_name, list):
+            self._target_ip = [addresses[host] for host in host_name]
+        else:
+            self._target_ip = addresses[host_name]
+        self._target_set = frozenset(addresses.values())
 
     
 
@@ -46,8 +58,53 @@ class Data:
         return self._target_ports
     
     @target_ports.setter
-    def target_ports(self, input_ports:str) -> None:
-        self._target_ports = Port_Set.get_ports(input_ports)
+    def target_ports(self, input_ports:str|list[int]) -> None:
+        self._target_ports = input_ports if isinstance(input_ports, list) else Port_Set.get_ports(input_ports)
+
+
+    
+    @property
+    def tls_cache(self) -> object:
+        if self._tls_cache is None:
+            from utils.tls_cache import TLS_Cache
+            self._tls_cache = TLS_Cache()
+        return self._tls_cache
+
+
+
+    @property
+    def transport(self) -> object:
+        if self._transport is None:
+            from transport.raw_transport import Raw_Transport
+            self._transport = Raw_Transport()
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport:object) -> None:
+        self._transport = transport
+
+
+
+    def save_caches(self) -> None:
+        self.resolver.save_cache()
+        if self._tls_cache is not None:
+            self._tls_cache.save_cache()
+
+
+
+    def close_output(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        if self.history is not None:
+            self.history.close()
+
+
+
+    def save_history(self, target:str, **results) -> None:
+        if self.history is None: return
+
+        scan_id:int = self.history.save_scan(self.command_name, target, self.metrics.snapshot(), **results)
+        print(f'Results saved as scan #{scan_id}')
 
 
     
@@ -57,10 +114,26 @@ class Data:
 
     
     def add_packet_info(self, protocol:str, packet_info:tuple) -> None:
-        if packet_info[0] in self._target_ip:
-            self._responses[protocol].add(packet_info)
+        if packet_info[0] not in self._target_set or packet_info in self._responses[protocol]: return
+
+        self._responses[protocol].add(packet_info)
+        if self.writer is not None:
+            self.writer.write_response(protocol, packet_info)
 
 
     def add_udp_info(self, packet_info:tuple) -> None:
-        if packet_info[0] in self._target_ip:
-            self._responses['UDP'].add(packet_info[1])
\ No newline at end of file
+        if packet_info[0] not in self._target_set or packet_info[1] in self._responses['UDP']: return
+
+        self._responses['UDP'].add(packet_info[1])
+        if self.writer is not None:
+            self.writer.write_response('UDP', packet_info[1], ip=packet_info[0])
+
+
+
+    def needs_fingerprint(self, ip:str, ttl_only:bool=False) -> bool:
+        if ip not in self._target_set: return False
+        return ip not in self.fingerprints or (not ttl_only and self.fingerprints[ip][1] is None)
+
+
+    def add_fingerprint(self, ip:str, signature:tuple) -> None:
+        self.fingerprints[ip] = signature
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing             import Callable
+from packet.layers.arp  import ARP
 from packet.layers.ip   import IP
 from packet.layers.icmp import ICMP
 from packet.layers.tcp  import TCP
@@ -9,36 +10,57 @@ from utils.type_hints   import Raw_Packet
 class Packet_Builder():
 
     @classmethod
-    def build_packet(cls, protocol:str, *args) -> Raw_Packet:
+    def build_packet(cls, protocol:str, *args, **kwargs) -> Raw_Packet:
         protocol_method:Callable = cls.PROTOCOLS.get(protocol)
-        return protocol_method(protocol, *args)
+        return protocol_method(protocol, *args, **kwargs)
     
     
 
     @staticmethod
-    def _get_icmp_packet(_) -> Raw_Packet:
+    def _get_icmp_packet(_, icmp_type:str='echo') -> Raw_Packet:
+        if icmp_type == 'timestamp':
+            return ICMP.create_icmp_timestamp_header()
         return ICMP.create_icmp_header()
 
     
 
     @staticmethod
-    def _get_tcp_ip_packet(protocol:str, dst_ip:int, dst_port:int) -> Raw_Packet:
-        ip_header:bytes  = IP.create_ip_header(dst_ip, protocol)
-        tcp_header:bytes = TCP.create_tcp_header(dst_ip, dst_port)
+    def _get_arp_packet(_, dst_ip:str, interface:str=None) -> Raw_Packet:
+        return ARP.create_arp_request(dst_ip, interface)
+
+    
+
+    @staticmethod
+    def _get_tcp_ip_packet(protocol:str, dst_ip:int, dst_port:int, source:bytes=None, flags:int=0x02) -> Raw_Packet:
+        ip_header:bytes  = IP.create_ip_header(dst_ip, protocol, source)
+        tcp_header:bytes = TCP.create_tcp_header(dst_ip, dst_port, source, flags=flags)
         return ip_header + tcp_header
     
 
 
     @staticmethod
-    def _get_udp_ip_packet(protocol:str, dst_ip:str, dst_port:int) -> Raw_Packet:
-        ip_header:bytes  = IP.create_ip_header(dst_ip, protocol)
-        udp_header:bytes = UDP.create_udp_header(dst_ip, dst_port)
+    def _get_udp_ip_packet(protocol:str, dst_ip:str, dst_port:int, source:bytes=None) -> Raw_Packet:
+        ip_header:bytes  = IP.create_ip_header(dst_ip, protocol, source)
+        udp_header:bytes = UDP.create_udp_header(dst_ip, dst_port, source)
         return ip_header + udp_header
 
 
 
+    @staticmethod
+    def _get_trace_packet(_, protocol:str, dst_ip:str, dst_port:int, ttl:int, source:bytes=None) -> Raw_Packet:
+        probe_id:int    = IP.encode_trace_ttl(ttl)
+        ip_header:bytes = IP.create_ip_header(dst_ip, protocol, source, ttl=ttl, ip_id=probe_id)
+        match protocol:
+            case 'ICMP': return ip_header + ICMP.create_icmp_header(sequence=probe_id)
+            case 'TCP':  return ip_header + TCP.create_tcp_header(dst_ip, dst_port, source, sequence=probe_id)
+            case 'UDP':  return ip_header + UDP.create_udp_header(dst_ip, dst_port, source)
+
+
+
     PROTOCOLS:dict = {
-        'ICMP': _get_icmp_packet,
-        'TCP':  _get_tcp_ip_packet,
-        'UDP':  _get_udp_ip_packet
+        'ARP':   _get_arp_packet,
+        'ICMP':  _get_icmp_packet,
+        'TCP':   _get_tcp_ip_packet,
+        'UDP':   _get_udp_ip_packet,
+        'TRACE': _get_trace_packet
     }
\ No newline at end of file
@@ -1,30 +1,26 @@
 import struct
-import sys
-from models.data        import Data
-from packet.layers.ip   import IP
-from packet.layers.icmp import ICMP
-from packet.layers.tcp  import TCP
-from packet.layers.udp  import UDP
+from threading             import Thread, Event
+from models.data           import Data
+from packet.layers.arp     import ARP
+from packet.layers.ip      import IP
+from packet.layers.icmp    import ICMP
+from packet.layers.tcp     import TCP
+from packet.layers.udp     import UDP
+from utils.status_reporter import Status_Reporter
+from utils.type_hints      import Raw_Packet
 
 
 class Packet_Dissector():
 
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
-
-
-
-    __slots__ = ('_data', '_packet', '_ip_header', '_len_ip_header')
+    __slots__ = ('_data', '_packet', '_ip_header', '_len_ip_header', '_tracing', '_discovering')
 
     def __init__(self, data:Data) -> None:
         self._data:Data            = data
         self._packet:memoryview    = None
         self._ip_header:memoryview = None
         self._len_ip_header:int    = None
+        self._tracing:bool         = data.command_name == 'trace'
+        self._discovering:bool     = data.command_name == 'netmap'
 
 
 
@@ -32,36 +28,41 @@ class Packet_Dissector():
         return self
     
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__class__._instance = None
         return False
 
 
 
-    def dissect_packets(self) -> None:
-        len_packets:int       = len(self._data.raw_packets)
-        dissected_packets:int = 0
-        
-        while self._data.raw_packets:
-            dissected_packets += 1
-            self._display_progress(dissected_packets, len_packets)
+    def dissect_packets(self, display_progress:bool=True) -> None:
+        reporter:Status_Reporter = Status_Reporter(
+            self._data.metrics, len(self._data.raw_packets), 'Dissected packets', 'frames_dissected',
+            responses=None, drops=('dissect_errors',), enabled=display_progress
+        )
 
-            self._packet      = memoryview(self._data.raw_packets.pop())
-            self._dissect_ip_header()
-            protocol_byte:int = IP.get_protocol(self._ip_header)
+        with reporter:
+            while self._data.raw_packets:
+                frame:Raw_Packet = self._data.raw_packets.pop()
+                self._dissect_frame(frame)
+                self._data.packet_arena.release(frame)
 
-            match protocol_byte:
-                case  1: self._dissect_icmp_header()
-                case  6: self._dissect_tcp_header()
-                case 17: self._dissect_udp_header()
+    
 
-        sys.stdout.write('\n')
+    def _dissect_frame(self, frame:Raw_Packet) -> None:
+        self._packet = memoryview(frame)
+        self._data.metrics.count('frames_dissected')
 
-    
+        if self._get_ether_type(self._packet) == 0x0806:
+            return self._dissect_arp_header()
 
-    @staticmethod
-    def _display_progress(index:int, len_ports:int, description:str='') -> None:
-        sys.stdout.write(f'\rDissected packets: {index}/{len_ports} {description}')
-        sys.stdout.flush()
+        try:
+            self._dissect_ip_header()
+            protocol_byte:int = IP.get_protocol(self._ip_header)
+        except (IndexError, struct.error, ValueError):
+            return self._data.metrics.count('dissect_errors')
+
+        match protocol_byte:
+            case  1: self._dissect_icmp_header()
+            case  6: self._dissect_tcp_header()
+            case 17: self._dissect_udp_header()
 
 
 
@@ -73,6 +74,27 @@ class Packet_Dissector():
 
 
 
+    @staticmethod
+    def _get_ether_type(packet:memoryview) -> int:
+        return (packet[12] << 8) | packet[13]
+
+
+
+    def _dissect_arp_header(self) -> None:
+        try:
+            arp_header:tuple = ARP.get_arp_header(self._packet)
+
+            if ARP.get_operation(arp_header) != 2: return
+
+            sender_ip:str  = ARP.get_sender_ip(arp_header)
+            sender_mac:str = ARP.get_sender_mac(arp_header)
+            self._data.add_packet_info('ARP', (sender_ip, sender_mac))
+
+        except (IndexError, struct.error, ValueError):
+            self._data.metrics.count('dissect_errors')
+
+
+
     def _dissect_ip_header(self, len_ether_header:int=14) -> None:
         self._ip_header     = IP.get_ip_header(self._packet, len_ether_header)
         self._len_ip_header = len(self._ip_header)
@@ -83,28 +105,43 @@ class Packet_Dissector():
         try:
             source_ip:str    = IP.get_source_ip(self._ip_header)
             tcp_header:tuple = TCP.get_tcp_header(self._packet, self._len_ip_header)
+
+            if self._tracing:
+                return self._add_hop(source_ip, TCP.get_tcp_acknowledge(tcp_header) - 1, source_ip)
+
             source_port:int  = TCP.get_tcp_source_port(tcp_header)
             flag_status:str  = TCP.get_tcp_flag_status(tcp_header)
 
             if flag_status is None: return
 
             self._data.add_packet_info('TCP', (source_ip, source_port, flag_status))
+
+            if flag_status == 'OPENED' and self._data.needs_fingerprint(source_ip):
+                self._data.add_fingerprint(source_ip, (
+                    IP.get_ttl(self._ip_header),
+                    TCP.get_tcp_window(tcp_header),
+                    TCP.get_tcp_option_layout(self._packet, self._len_ip_header, tcp_header)
+                ))
         
         except (IndexError, struct.error, ValueError):
-            return
+            self._data.metrics.count('dissect_errors')
         
     
 
     def _dissect_udp_header(self) -> tuple[str, int] | None:
         try:
+            if self._discovering:
+                source_ip:str = IP.get_source_ip(self._ip_header)
+                return self._data.add_packet_info('UDP', (source_ip, self._get_source_mac_address(self._packet)))
+
             dst_ip:str            = IP.get_destiny_ip(self._ip_header)
             udp_header:memoryview = UDP.get_udp_header(self._packet, self._len_ip_header)
             dst_port:int          = UDP.get_udp_destiny_port(udp_header)
 
             return self._data.add_udp_info((dst_ip, dst_port))
         
-        except Exception as e:
-            return
+        except Exception:
+            self._data.metrics.count('dissect_errors')
 
 
 
@@ -115,11 +152,84 @@ class Packet_Dissector():
             icmp_header:memoryview = ICMP.get_icmp_header(self._packet, self._len_ip_header)
             icmp_type, icmp_code   = ICMP.get_icmp_type_and_code(icmp_header)
 
+            if self._tracing:
+                return self._dissect_trace_reply(source_ip, icmp_type, icmp_header)
+
+            if self._discovering and icmp_type == 3:
+                if icmp_code == 3: self._data.add_packet_info('UDP', (source_ip, source_mac))
+                return
+
             if icmp_type == 3 and icmp_code == 3:
-                payload:bytes = ICMP.extract_icmp_payload(self._packet, self._len_ip_header)
+                payload:bytes = bytes(ICMP.extract_icmp_payload(self._packet, self._len_ip_header))
                 self._data.raw_packets.append(payload)
 
             self._data.add_packet_info('ICMP', (source_ip, source_mac))
+
+            if icmp_type == 0 and self._data.needs_fingerprint(source_ip, ttl_only=True):
+                self._data.add_fingerprint(source_ip, (IP.get_ttl(self._ip_header), None, None))
         
         except (IndexError, struct.error, ValueError):
-            return
\ No newline at end of file
+            self._data.metrics.count('dissect_errors')
+
+
+
+    
+    # TRACE ================================================================================
+
+    def _dissect_trace_reply(self, source_ip:str, icmp_type:int, icmp_header:tuple) -> None:
+        if icmp_type == 0:
+            return self._add_hop(source_ip, ICMP.get_icmp_sequence(icmp_header), source_ip)
+
+        if icmp_type not in (3, 11): return
+
+        quoted_header:memoryview = IP.get_ip_header(self._packet, 14 + self._len_ip_header + 8)
+        self._add_hop(IP.get_destiny_ip(quoted_header), IP.get_ip_id(quoted_header), source_ip)
+
+
+
+    def _add_hop(self, target_ip:str, probe_id:int, hop_ip:str) -> None:
+        ttl:int = IP.decode_trace_ttl(probe_id)
+        if ttl is not None:
+            self._data.add_packet_info('TRACE', (target_ip, ttl, hop_ip))
+
+
+
+
+
+class Live_Dissector:
+
+    __slots__ = ('_data', '_interval', '_on_dissected', '_stop', '_thread')
+
+    def __init__(self, data:Data, interval:float=0.1, on_dissected:callable=None) -> None:
+        self._data:Data             = data
+        self._interval:float        = interval
+        self._on_dissected:callable = on_dissected
+        self._stop:Event            = Event()
+        self._thread:Thread         = Thread(target=self._run)
+
+
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._dissect()
+        self._dissect()
+
+
+
+    def _dissect(self) -> None:
+        with Packet_Dissector(self._data) as dissector:
+            dissector.dissect_packets(display_progress=False)
+
+        if self._on_dissected is not None:
+            self._on_dissected()
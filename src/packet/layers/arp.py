@@ -0,0 +1,70 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import socket
+from struct             import Struct
+from utils.network_info import Interface_Context, get_interface_context
+
+
+class ARP:
+
+    _ETHER_HEADER_STRUCT:Struct = Struct('!6s6sH')
+    _ARP_HEADER_STRUCT:Struct   = Struct('!HHBBH6s4s6s4s')
+
+    # BUILDER ================================================================================================
+
+    _BROADCAST_MAC:bytes = b'\xff' * 6
+
+
+    @classmethod
+    def create_arp_request(cls, dst_ip:str, interface:str=None) -> bytes:
+        context:Interface_Context = get_interface_context(interface)
+        my_mac:bytes              = bytes.fromhex(context.mac.replace(':', ''))
+
+        ether_header:bytes = cls._ETHER_HEADER_STRUCT.pack(
+            cls._BROADCAST_MAC, #......: Destiny MAC (broadcast)
+            my_mac, #..................: Source MAC
+            0x0806 #...................: EtherType (ARP)
+        )
+        arp_header:bytes = cls._ARP_HEADER_STRUCT.pack(
+            1, #.......................: Hardware type (Ethernet)
+            0x0800, #..................: Protocol type (IPv4)
+            6, #.......................: Hardware address length
+            4, #.......................: Protocol address length
+            1, #.......................: Operation (request)
+            my_mac, #..................: Sender MAC
+            context.packed_address, #..: Sender IP
+            bytes(6), #................: Target MAC (unknown)
+            socket.inet_aton(dst_ip) #.: Target IP
+        )
+        return ether_header + arp_header
+
+
+
+    # DISSECTOR ==============================================================================================
+
+    @classmethod
+    def get_arp_header(cls, packet:memoryview, len_ether_header:int=14) -> tuple:
+        end:int = len_ether_header + cls._ARP_HEADER_STRUCT.size
+        return cls._ARP_HEADER_STRUCT.unpack(packet[len_ether_header : end])
+
+
+
+    @staticmethod
+    def get_operation(arp_header:tuple) -> int:
+        return arp_header[4]
+
+
+
+    @staticmethod
+    def get_sender_ip(arp_header:tuple) -> str:
+        return socket.inet_ntoa(arp_header[6])
+
+
+
+    @staticmethod
+    def get_sender_mac(arp_header:tuple) -> str:
+        return ':'.join('%02x' % b for b in arp_header[5])
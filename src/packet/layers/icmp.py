@@ -5,6 +5,8 @@
 
 
 import os
+import struct
+import time
 from struct                      import Struct
 from packet.layers.layer_4_utils import Layer_4_Utils
 
@@ -25,10 +27,10 @@ class ICMP:
 
 
     @classmethod
-    def create_icmp_header(cls) -> bytes:
+    def create_icmp_header(cls, sequence:int=1) -> bytes:
             id:int        = os.getpid() & 0xFFFF
             fields:list   = list(cls._BASE_ICMP_FIELDS)
-            fields[-2]    = id
+            fields[-2:]   = [id, sequence]
             header:bytes  = cls._ICMP_HEADER_STRUCT.pack(*fields)
             
             payload:bytes = os.urandom(56)
@@ -41,6 +43,16 @@ class ICMP:
 
 
 
+    @classmethod
+    def create_icmp_timestamp_header(cls) -> bytes:
+        originate:int = int(time.time() % 86400 * 1000)
+        fields:list   = [13, 0, 0, os.getpid() & 0xFFFF, 1]
+        payload:bytes = struct.pack('!III', originate, 0, 0)
+        fields[2]     = Layer_4_Utils.checksum(cls._ICMP_HEADER_STRUCT.pack(*fields) + payload)
+        return cls._ICMP_HEADER_STRUCT.pack(*fields) + payload
+
+
+
     # DISSECTOR ==============================================================================================
 
     @classmethod
@@ -60,6 +72,12 @@ class ICMP:
 
 
 
+    @staticmethod
+    def get_icmp_sequence(icmp_header:tuple) -> int:
+        return icmp_header[4]
+
+
+
     @staticmethod
     def extract_icmp_payload(packet:memoryview, len_ip_header:int) -> bytes:
         try:
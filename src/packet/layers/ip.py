@@ -4,10 +4,11 @@
 # Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
 
 
+import os
 import socket
 from random             import randint
 from struct             import Struct
-from utils.network_info import get_my_ip_address
+from utils.network_info import get_interface_context
 
 
 class IP:
@@ -15,31 +16,51 @@ class IP:
     # BUILDER ================================================================================================
     
     _IP_HEADER_STRUCT:Struct = Struct('!BBHHHBBH4s4s')
-    _MY_IP:str               = socket.inet_aton(get_my_ip_address())
     _PROTOCOL_CODE:dict = {
-        'TCP': socket.IPPROTO_TCP,
-        'UDP': socket.IPPROTO_UDP
+        'ICMP': socket.IPPROTO_ICMP,
+        'TCP':  socket.IPPROTO_TCP,
+        'UDP':  socket.IPPROTO_UDP
     }
 
 
     @classmethod
-    def create_ip_header(cls, dst_ip:str, protocol:str) -> bytes:
+    def create_ip_header(cls, dst_ip:str, protocol:str, source:bytes=None, ttl:int=64, ip_id:int=None) -> bytes:
         protocol_code:int = cls._PROTOCOL_CODE.get(protocol)
+        my_ip:bytes       = source or get_interface_context().packed_address
         return cls._IP_HEADER_STRUCT.pack(
             (4 << 4) + 5, #..............: IP version and IHL (Internet Header Length)
             0, #.........................: TOS (Type of Service)
             40, #........................: Total length
-            randint(10000, 65535), #.....: IP ID
+            ip_id or randint(10000, 65535), #: IP ID
             0, #.........................: Flags and Fragment offset
-            64, #........................: TLL (Time to Live)
+            ttl, #.......................: TLL (Time to Live)
             protocol_code, #.............: Protocol code
             0, #.........................: Checksum (Will be populated by the kernel)
-            cls._MY_IP, #................: Source IP
+            my_ip, #.....................: Source IP
             socket.inet_aton(dst_ip) #...: Destiny IP
         )
     
 
 
+    # TRACE PROBES ===========================================================================================
+
+    _TRACE_KEY:int = os.getpid() & 0x3FF
+    MAX_TTL:int    = 0x3F
+
+
+    @classmethod
+    def encode_trace_ttl(cls, ttl:int) -> int:
+        return (cls._TRACE_KEY << 6) | ttl
+
+
+
+    @classmethod
+    def decode_trace_ttl(cls, value:int) -> int|None:
+        if value >> 6 != cls._TRACE_KEY: return None
+        return value & cls.MAX_TTL
+
+
+
     # DISSECTOR ==============================================================================================
 
     _SOURCE_IP_STRUCT:Struct = Struct('4s')
@@ -65,6 +86,18 @@ class IP:
     
 
 
+    @staticmethod
+    def get_ttl(ip_header:memoryview) -> int:
+        return ip_header[8]
+
+
+
+    @staticmethod
+    def get_ip_id(ip_header:memoryview) -> int:
+        return (ip_header[4] << 8) | ip_header[5]
+
+
+
     @classmethod
     def get_destiny_ip(cls, ip_header:memoryview) -> str:
         raw_bytes:bytes = cls._SOURCE_IP_STRUCT.unpack(ip_header[16:20])[0]
@@ -6,19 +6,19 @@
 
 import socket
 from struct             import Struct
-from utils.network_info import get_my_ip_address
+from utils.network_info import get_interface_context
 
 
 class Layer_4_Utils:
 
     _PSEUDO_HEADER_STRUCT:Struct = Struct('!4s4sBBH')
-    _MY_IP:str = socket.inet_aton(get_my_ip_address())
 
 
     @classmethod
-    def pseudo_header(cls, dst_ip:str, protocol:int, length:int) -> bytes:
+    def pseudo_header(cls, dst_ip:str, protocol:int, length:int, source:bytes=None) -> bytes:
+        my_ip:bytes = source or get_interface_context().packed_address
         return cls._PSEUDO_HEADER_STRUCT.pack(
-                           cls._MY_IP, #.................: Source IP
+                           my_ip, #......................: Source IP
                            socket.inet_aton(dst_ip), #...: Destiny IP
                            0, #..........................: Reserved
                            protocol, #...................: Protocol
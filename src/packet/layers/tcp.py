@@ -5,6 +5,7 @@
 
 
 import socket
+import time
 from struct                      import Struct
 from packet.layers.layer_4_utils import Layer_4_Utils
 from utils.port_set              import Port_Set
@@ -30,21 +31,41 @@ class TCP:
     )
 
 
+    # SYNs offer the options of a stock Linux stack (M,S,T,N,W), so the SYN-ACK options match the OS signatures
+    _SYN_OPTIONS:Struct = Struct('!BBH BB BBLL B BBB')
+
+
     @classmethod
-    def create_tcp_header(cls, dst_ip:int, dst_port:int) -> bytes:
+    def create_tcp_header(cls, dst_ip:int, dst_port:int, source:bytes=None, sequence:int=0, flags:int=0x02) -> bytes:
         src_port:int     = Port_Set.get_random_port()
+        options:bytes    = cls._create_syn_options() if flags & 0x02 else b''
         
         fields:list      = list(cls._BASE_TCP_FIELDS)
-        fields[0:2]      = [src_port, dst_port]
-        tcp_header:bytes = cls._TCP_HEADER_STRUCT.pack(*fields)
+        fields[0:3]      = [src_port, dst_port, sequence]
+        fields[4]        = (5 + len(options) // 4) << 4
+        fields[5]        = flags
+        tcp_header:bytes = cls._TCP_HEADER_STRUCT.pack(*fields) + options
         
-        pseudo_hdr:bytes = Layer_4_Utils.pseudo_header(dst_ip, socket.IPPROTO_TCP, len(tcp_header))
+        pseudo_hdr:bytes = Layer_4_Utils.pseudo_header(dst_ip, socket.IPPROTO_TCP, len(tcp_header), source)
         checksum:int     = Layer_4_Utils.checksum(pseudo_hdr + tcp_header)
 
         fields[-2]       = checksum
-        tcp_header:bytes = cls._TCP_HEADER_STRUCT.pack(*fields)
+        tcp_header:bytes = cls._TCP_HEADER_STRUCT.pack(*fields) + options
 
         return tcp_header
+
+
+
+    @classmethod
+    def _create_syn_options(cls) -> bytes:
+        timestamp:int = int(time.monotonic() * 1000) & 0xFFFFFFFF
+        return cls._SYN_OPTIONS.pack(
+            2, 4, 1460, #.............: MSS
+            4, 2, #...................: SACK permitted
+            8, 10, timestamp, 0, #....: Timestamps
+            1, #......................: NOP
+            3, 3, 7 #.................: Window scale
+        )
     
 
 
@@ -72,6 +93,31 @@ class TCP:
         return tcp_header[0]
     
 
+    @staticmethod
+    def get_tcp_window(tcp_header:tuple) -> int:
+        return tcp_header[6]
+    
+
+    _OPTION_LETTERS:dict = {0: 'E', 1: 'N', 2: 'M', 3: 'W', 4: 'S', 8: 'T'}
+
+    @classmethod
+    def get_tcp_option_layout(cls, packet:memoryview, ip_header_len:int, tcp_header:tuple) -> str:
+        start:int   = 14 + ip_header_len + 20
+        end:int     = 14 + ip_header_len + (tcp_header[4] >> 4) * 4
+        layout:list = []
+        while start < end:
+            kind:int = packet[start]
+            layout.append(cls._OPTION_LETTERS.get(kind, '?'))
+            if kind == 0: break
+            start += 1 if kind == 1 else max(packet[start + 1], 2)
+        return ','.join(layout)
+    
+
+    @staticmethod
+    def get_tcp_acknowledge(tcp_header:tuple) -> int:
+        return tcp_header[3]
+    
+
     @classmethod
     def get_tcp_flag_status(cls, tcp_header:tuple) -> int:
         return cls.TCP_FLAG_STATUS.get(tcp_header[5] & (0b00111111), None)
\ No newline at end of file
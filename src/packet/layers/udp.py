@@ -25,14 +25,14 @@ class UDP:
 
 
     @classmethod
-    def create_udp_header(cls, dst_ip:str, dst_port) -> bytes:
+    def create_udp_header(cls, dst_ip:str, dst_port, source:bytes=None) -> bytes:
         src_port:int     = Port_Set.get_random_port()
 
         fileds:list      = list(cls._UDP_BASE_FIELDS)
         fileds[0:2]      = [src_port, dst_port]
         udp_header:bytes = cls._UDP_HEADER_STRUCT.pack(*fileds)
         
-        pseudo_header:bytes = Layer_4_Utils.pseudo_header(dst_ip, socket.IPPROTO_UDP, len(udp_header))
+        pseudo_header:bytes = Layer_4_Utils.pseudo_header(dst_ip, socket.IPPROTO_UDP, len(udp_header), source)
         checksum:int        = Layer_4_Utils.checksum(pseudo_header + udp_header)
         
         fileds[-1]       = checksum
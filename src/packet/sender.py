@@ -2,13 +2,45 @@ import socket
 from utils.type_hints import Raw_Packet
 
 
-def send_layer_3_packet(packet:Raw_Packet, target_ip:str, port:int) -> None:
+def create_layer_3_socket(interface:str=None) -> socket.socket:
     sock:socket.socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
     sock.setsockopt(socket.IPPROTO_IP, socket.IP_HDRINCL, 1)
-    sock.sendto(packet, (target_ip, port))
+    if interface: sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode())
+    return sock
 
 
-def send_ping(packet:Raw_Packet, ip:str) -> None:
+def create_icmp_socket(interface:str=None) -> socket.socket:
     sock:socket.socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
-    sock.sendto(packet, (ip, 1))
-    sock.close()
\ No newline at end of file
+    if interface: sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode())
+    return sock
+
+
+def create_layer_2_socket(interface:str) -> socket.socket:
+    sock:socket.socket = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+    sock.bind((interface, 0))
+    return sock
+
+
+
+def send_layer_3_packet(packet:Raw_Packet, target_ip:str, port:int, sock:socket.socket=None) -> None:
+    sock:socket.socket = sock or create_layer_3_socket()
+    sock.sendto(packet, (target_ip, port))
+
+
+def send_ping(packet:Raw_Packet, ip:str, sock:socket.socket=None) -> None:
+    if sock is not None:
+        sock.sendto(packet, (ip, 1))
+        return
+
+    with create_icmp_socket() as sock:
+        sock.sendto(packet, (ip, 1))
+
+
+def send_layer_2_packets(packets:list[Raw_Packet], interface:str, sock:socket.socket=None) -> None:
+    if sock is not None:
+        for packet in packets: sock.send(packet)
+        return
+
+    with create_layer_2_socket(interface) as sock:
+        for packet in packets:
+            sock.send(packet)
@@ -13,7 +13,7 @@ SOURCE_DIR=$(dirname "$(realpath "$0")")
 ROOT_DIR=${SOURCE_DIR%/*/*}
 DESTINY_DIR="/opt/netxplorer"
 WRAPPER_FILE="xplorer"
-DIRECTORIES=("config" "core" "models" "packet" "packet/layers" "sniffing" "utils")
+DIRECTORIES=("config" "core" "models" "packet" "packet/layers" "sniffing" "transport" "utils")
 FILES=(
     # CONFIG ===================
     "config/__init__.py"              
@@ -21,13 +21,18 @@ FILES=(
     # CORE=======================
     "core/__init__.py"
     "core/banner_grabber.py"
+    "core/connect_scanner.py"
+    "core/distributed.py"
     "core/network_mapper.py"
+    "core/path_tracer.py"
     "core/port_scanner.py"
+    "core/scan_diff.py"
     # MODEL =====================
     "models/__init__.py"
     "models/data.py"
     # PACKET ====================
     "packet/layers/__init__.py"
+    "packet/layers/arp.py"
     "packet/layers/icmp.py"
     "packet/layers/ip.py"
     "packet/layers/layer_4_utils.py"
@@ -41,13 +46,33 @@ FILES=(
     "sniffing/__init__.py"
     "sniffing/bpf_filter.py"
     "sniffing/sniffer.py"
+    # TRANSPORT =================
+    "transport/__init__.py"
+    "transport/raw_transport.py"
+    "transport/simulated_transport.py"
     # UTILS =====================
     "utils/__init__.py"
+    "utils/dns_resolver.py"
+    "utils/http_parser.py"
     "utils/network_info.py"
+    "utils/os_fingerprint.py"
+    "utils/packet_arena.py"
     "utils/port_set.py"
+    "utils/result_writer.py"
+    "utils/route_table.py"
+    "utils/scan_history.py"
+    "utils/scan_metrics.py"
+    "utils/service_fingerprint.py"
+    "utils/services.txt"
+    "utils/services_db.py"
+    "utils/stage_profiler.py"
+    "utils/status_reporter.py"
+    "utils/target_index.py"
+    "utils/tls_cache.py"
     "utils/type_hints.py"
     # ROOT ======================
     "__init__.py"
+    "api.py"
     "main.py"
 )
 
@@ -1,23 +1,31 @@
 import struct
-import socket
-from utils.network_info import get_my_ip_address
+from utils.network_info import get_interface_context
+from utils.packet_arena import SNAP_LENGTH
 from utils.type_hints   import BPF_Instruction
 
 
 class BPF_Filter:
 
     @staticmethod
-    def get_filter(protocol:str) -> BPF_Instruction:
+    def get_filter(protocol:str, interface:str=None) -> BPF_Instruction:
         match protocol:
-            case 'TCP':      return BPF_Filter._get_tcp_responses_parameters()
-            case 'UDP':      return BPF_Filter._get_udp_responses_parameters()
-            case 'TCP-ICMP': return BPF_Filter._get_tcp__and_icmp_responses_parameters()
+            case 'TCP':       return BPF_Filter._get_tcp_responses_parameters(interface)
+            case 'UDP':       return BPF_Filter._get_udp_responses_parameters(interface)
+            case 'DISCOVERY': return BPF_Filter._get_discovery_responses_parameters(interface)
+            case 'ARP':       return BPF_Filter._get_arp_responses_parameters(interface)
+            case 'TRACE':     return BPF_Filter._get_trace_responses_parameters(interface)
 
 
 
     @staticmethod
-    def _get_tcp_responses_parameters() -> BPF_Instruction:
-        my_ip_hex:int = struct.unpack('!I', socket.inet_aton(get_my_ip_address()))[0]
+    def _get_my_ip_hex(interface:str) -> int:
+        return struct.unpack('!I', get_interface_context(interface).packed_address)[0]
+
+
+
+    @staticmethod
+    def _get_tcp_responses_parameters(interface:str) -> BPF_Instruction:
+        my_ip_hex:int = BPF_Filter._get_my_ip_hex(interface)
         return [
             (0x28, 0,  0, 0x0000000c), # Load EtherType field (offset 12)
             (0x15, 0, 11, 0x00000800), # If not IPv4 (0x0800), jump to end
@@ -31,44 +39,42 @@ class BPF_Filter:
             (0x50, 0,  0, 0x0000001b), # Load TCP flags byte (offset 27 from IP header)
             (0x54, 0,  0, 0x00000012), # Mask with SYN+ACK (0x12)
             (0x15, 0,  1, 0x00000012), # If flags are exactly SYN+ACK, continue
-            (0x6,  0,  0, 0x00040000), # Accept packet (return up to 262144 bytes)
+            (0x6,  0,  0, SNAP_LENGTH), # Accept packet (return the first SNAP_LENGTH bytes)
             (0x6,  0,  0, 0x00000000), # Reject everything else
         ]
     
 
 
     @staticmethod
-    def _get_tcp__and_icmp_responses_parameters() -> BPF_Instruction:
-        my_ip_hex:int = struct.unpack('!I', socket.inet_aton(get_my_ip_address()))[0]
+    def _get_discovery_responses_parameters(interface:str) -> BPF_Instruction:
+        my_ip_hex:int = BPF_Filter._get_my_ip_hex(interface)
         return [
             (0x28,  0,  0, 0x0000000c), # Load EtherType (offset 12) into A
-            (0x15,  0, 19, 0x00000800), # If EtherType != IPv4 (0x0800), jump to reject
+            (0x15,  0, 17, 0x00000800), # If EtherType != IPv4 (0x0800), jump to reject
             (0x20,  0,  0, 0x0000001e), # Load destination IP (offset 30) into A
-            (0x15,  0, 17, my_ip_hex),  # If dest IP != my IP, jump to reject
+            (0x15,  0, 15, my_ip_hex),  # If dest IP != my IP, jump to reject
             (0x30,  0,  0, 0x00000017), # Load IP protocol (offset 23) into A
-            (0x15,  0,  5, 0x00000001), # If protocol == ICMP (0x01), jump ahead to ICMP check
-            (0x28,  0,  0, 0x00000014), # Load IP flags/frag offset
-            (0x45, 13,  0, 0x00001fff), # If fragmented, skip all (frag != 0), jump to reject
-            (0xb1,  0,  0, 0x0000000e), # A = A + 14 (to get start of IP header)
-            (0x50,  0,  0, 0x0000000e), # Load ICMP type (offset 14) into A
-            (0x15,  9, 10, 0x00000000), # If ICMP type == 0 (Echo Reply), accept
-            (0x15,  0,  9, 0x00000006), # If not TCP (protocol != 6), jump to reject
-            (0x28,  0,  0, 0x00000014), # Load IP flags/frag offset again (needed for TCP branch)
-            (0x45,  7,  0, 0x00001fff), # If fragmented, reject
-            (0xb1,  0,  0, 0x0000000e), # A = A + 14 again
+            (0x15,  0,  5, 0x00000001), # If protocol != ICMP (0x01), jump ahead to the TCP check
+            (0xb1,  0,  0, 0x0000000e), # X = IP header length
+            (0x50,  0,  0, 0x0000000e), # Load ICMP type (offset 14 from IP header)
+            (0x15,  9,  0, 0x00000000), # If Echo Reply (0), accept
+            (0x15,  8,  0, 0x0000000e), # If Timestamp Reply (14), accept
+            (0x15,  7,  8, 0x00000003), # If Destination Unreachable (3), accept, otherwise reject
+            (0x15,  0,  5, 0x00000006), # If protocol != TCP (6), jump ahead to the UDP check
+            (0xb1,  0,  0, 0x0000000e), # X = IP header length
             (0x50,  0,  0, 0x0000001b), # Load TCP flags (offset 27 from IP header)
+            (0x45,  3,  0, 0x00000004), # If RST bit set (answer to a SYN or ACK probe), accept
             (0x54,  0,  0, 0x00000012), # Mask flags with SYN (0x02) + ACK (0x10)
-            (0x15,  2,  0, 0x00000012), # If SYN-ACK, accept
-            (0x50,  0,  0, 0x0000001b), # Load TCP flags again
-            (0x45,  0,  1, 0x00000004), # If RST bit set, accept
-            (0x6,   0,  0, 0x00040000), # Accept packet (return 262144 bytes)
+            (0x15,  1,  2, 0x00000012), # If SYN-ACK, accept, otherwise reject
+            (0x15,  0,  1, 0x00000011), # If protocol == UDP (17), accept (reply to a UDP probe)
+            (0x6,   0,  0, SNAP_LENGTH), # Accept packet (return the first SNAP_LENGTH bytes)
             (0x6,   0,  0, 0x00000000), # Reject otherwise
         ]
 
 
     @staticmethod
-    def _get_udp_responses_parameters() -> list[tuple]:
-        my_ip_hex:int = struct.unpack('!I', socket.inet_aton(get_my_ip_address()))[0]
+    def _get_udp_responses_parameters(interface:str) -> list[tuple]:
+        my_ip_hex:int = BPF_Filter._get_my_ip_hex(interface)
         return [
             (0x28, 0,  0, 0x0000000c), # Load 2 bytes from [12] (EtherType)
             (0x15, 0, 12, 0x00000800), # If EtherType != 0x0800 (IPv4), jump to reject
@@ -83,6 +89,47 @@ class BPF_Filter:
             (0x15, 0,  3, 0x00000003), # If ICMP type != 3 (dest unreachable), reject
             (0x50, 0,  0, 0x0000000f), # Load 1 byte from [A+15] (ICMP code)
             (0x15, 0,  1, 0x00000003), # If ICMP code != 3 (port unreachable), reject
-            (0x6,  0,  0, 0x00040000), # Accept packet (return 262144 bytes)
+            (0x6,  0,  0, SNAP_LENGTH), # Accept packet (return the first SNAP_LENGTH bytes)
+            (0x6,  0,  0, 0x00000000), # Reject packet
+        ]
+
+
+
+    @staticmethod
+    def _get_arp_responses_parameters(interface:str) -> BPF_Instruction:
+        my_ip_hex:int = BPF_Filter._get_my_ip_hex(interface)
+        return [
+            (0x28, 0, 0, 0x0000000c), # Load EtherType (offset 12)
+            (0x15, 0, 5, 0x00000806), # If EtherType != ARP (0x0806), jump to reject
+            (0x28, 0, 0, 0x00000014), # Load ARP operation (offset 20)
+            (0x15, 0, 3, 0x00000002), # If operation != reply (2), jump to reject
+            (0x20, 0, 0, 0x00000026), # Load ARP target IP (offset 38)
+            (0x15, 0, 1, my_ip_hex),  # If target IP != my IP, jump to reject
+            (0x6,  0, 0, SNAP_LENGTH), # Accept packet (return the first SNAP_LENGTH bytes)
+            (0x6,  0, 0, 0x00000000), # Reject packet
+        ]
+
+
+
+    @staticmethod
+    def _get_trace_responses_parameters(interface:str) -> BPF_Instruction:
+        my_ip_hex:int = BPF_Filter._get_my_ip_hex(interface)
+        return [
+            (0x28, 0,  0, 0x0000000c), # Load EtherType (offset 12)
+            (0x15, 0, 14, 0x00000800), # If EtherType != IPv4 (0x0800), jump to reject
+            (0x20, 0,  0, 0x0000001e), # Load destination IP (offset 30)
+            (0x15, 0, 12, my_ip_hex),  # If dest IP != my IP, jump to reject
+            (0x30, 0,  0, 0x00000017), # Load IP protocol (offset 23)
+            (0x15, 0,  5, 0x00000001), # If protocol != ICMP, jump to the TCP check
+            (0xb1, 0,  0, 0x0000000e), # X = IP header length
+            (0x50, 0,  0, 0x0000000e), # Load ICMP type (offset 14 from IP header)
+            (0x15, 6,  0, 0x0000000b), # If Time Exceeded (11), accept
+            (0x15, 5,  0, 0x00000003), # If Destination Unreachable (3), accept
+            (0x15, 4,  5, 0x00000000), # If Echo Reply (0), accept, otherwise reject
+            (0x15, 0,  4, 0x00000006), # If protocol != TCP, jump to reject
+            (0xb1, 0,  0, 0x0000000e), # X = IP header length
+            (0x50, 0,  0, 0x0000001b), # Load TCP flags (offset 27 from IP header)
+            (0x45, 0,  1, 0x00000006), # If SYN or RST is set, accept
+            (0x6,  0,  0, SNAP_LENGTH), # Accept packet (return the first SNAP_LENGTH bytes)
             (0x6,  0,  0, 0x00000000), # Reject packet
-        ]
\ No newline at end of file
+        ]
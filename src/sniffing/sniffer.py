@@ -1,6 +1,8 @@
 import socket
 import ctypes
 import select
+import struct
+import time
 from threading           import Thread
 from queue               import Queue
 from models.data         import Data
@@ -11,20 +13,14 @@ from utils.type_hints    import BPF_Instruction, BPF_Configured_Socket, Raw_Pack
 
 class Sniffer:
 
-    _instance:"Sniffer" = None
-    
-    def __new__(cls, *args, **kwargs) -> None:
-        if cls._instance is None:
-            cls._instance = object().__new__(cls)
-        return cls._instance
-
-    
+    _STATISTICS_INTERVAL:float = 0.25
 
-    __slots__ = ('_data', '_protocols', '_running', '_sniffer', '_thread_sniffer', '_thread_store', '_queue')
+    __slots__ = ('_data', '_protocols', '_interface', '_running', '_sniffer', '_thread_sniffer', '_thread_store', '_queue')
 
-    def __init__(self, data:Data, protocols:str) -> None:
+    def __init__(self, data:Data, protocols:str, interface:str=None) -> None:
         self._data:Data                     = data
         self._protocols:list                = protocols
+        self._interface:str                 = interface or get_default_iface()
         self._running:bool                  = True
         self._sniffer:BPF_Configured_Socket = None
         self._thread_sniffer:Thread         = None
@@ -40,7 +36,6 @@ class Sniffer:
     
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__class__._instance = None
         return False
 
 
@@ -54,11 +49,19 @@ class Sniffer:
 
 
     def _sniff(self) -> None:
-        while self._running is True:
-            readable, _, _= select.select([self._sniffer], [], [], 0)
-            if readable:
-                packet, _ = self._sniffer.recvfrom(65535)
-                self._queue.put(packet)
+        next_statistics:float = time.monotonic() + self._STATISTICS_INTERVAL
+        with self._data.metrics.stage('sniffing'):
+            while self._running is True:
+                readable, _, _= select.select([self._sniffer], [], [], 0)
+                if readable:
+                    packet:memoryview = self._data.packet_arena.receive(self._sniffer)
+                    self._queue.put(packet)
+                    self._data.metrics.count('frames_received')
+
+                # The kernel resets its counters on every read, so the drops show up in the status line while sniffing
+                if time.monotonic() >= next_statistics:
+                    self._record_kernel_statistics()
+                    next_statistics += self._STATISTICS_INTERVAL
 
 
     
@@ -76,16 +79,31 @@ class Sniffer:
         self._running = False
         self._thread_sniffer.join()
         self._thread_store.join()
+        self._record_kernel_statistics()
         self._sniffer.close()
 
 
 
+    def _record_kernel_statistics(self) -> None:
+        SOL_PACKET:int        = 263
+        PACKET_STATISTICS:int = 6
+        try:
+            statistics:bytes = self._sniffer.getsockopt(SOL_PACKET, PACKET_STATISTICS, 8)
+        except OSError:
+            return
+
+        accepted, dropped = struct.unpack('II', statistics)
+        self._data.metrics.count('frames_accepted', accepted)
+        self._data.metrics.count('kernel_drops', dropped)
+
+
+
     def _create_sniffer(self) -> BPF_Configured_Socket:
         sniffer:socket.socket = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.ntohs(0x0003))
         sniffer.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
-        sniffer.bind((get_default_iface(), 0))
+        sniffer.bind((self._interface, 0))
 
-        bpf_filter:BPF_Instruction = BPF_Filter.get_filter(self._protocols)
+        bpf_filter:BPF_Instruction = BPF_Filter.get_filter(self._protocols, self._interface)
         filter_array:int           = (sock_filter * len(bpf_filter))()
         
         for i, (code, jt, jf, k) in enumerate(bpf_filter):
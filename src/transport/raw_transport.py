@@ -0,0 +1,61 @@
+import socket
+import time
+from models.data        import Data
+from packet.sender      import create_icmp_socket, create_layer_3_socket, create_layer_2_socket
+from sniffing.sniffer   import Sniffer
+from utils.dns_resolver import DNS_Resolver
+from utils.network_info import get_local_network
+from utils.route_table  import Route, get_route
+
+
+class Raw_Transport:
+
+    __slots__ = ()
+
+    def route(self, network:str) -> Route:
+        return get_route(network)
+
+
+
+    def local_network(self) -> str:
+        return get_local_network()
+
+
+
+    def layer_3_socket(self, interface:str=None) -> socket.socket:
+        return create_layer_3_socket(interface)
+
+
+
+    def icmp_socket(self, interface:str=None) -> socket.socket:
+        return create_icmp_socket(interface)
+
+
+
+    def layer_2_socket(self, interface:str) -> socket.socket:
+        return create_layer_2_socket(interface)
+
+
+
+    def tcp_socket(self) -> socket.socket:
+        return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+
+
+    def sniffer(self, data:Data, protocols:str, interface:str=None) -> Sniffer:
+        return Sniffer(data, protocols, interface)
+
+
+
+    def resolver(self) -> DNS_Resolver:
+        return DNS_Resolver()
+
+
+
+    def pace(self, seconds:float) -> None:
+        time.sleep(seconds)
+
+
+
+    def wait(self, seconds:float) -> None:
+        time.sleep(seconds)
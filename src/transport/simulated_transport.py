@@ -0,0 +1,559 @@
+import errno
+import heapq
+import ipaddress
+import json
+import os
+import random
+import socket
+import struct
+import time
+import zlib
+from threading                   import Thread, Lock
+from models.data                 import Data
+from packet.layers.layer_4_utils import Layer_4_Utils
+from utils.dns_resolver           import DNS_Resolver
+from utils.network_info          import Interface_Context, register_virtual_interface
+from utils.port_set              import Port_Set
+from utils.route_table           import Route
+
+
+class Simulated_Transport:
+
+    INTERFACE:str = 'sim0'
+
+    __slots__ = ('network', '_route')
+
+    def __init__(self, config:dict) -> None:
+        self.network:Virtual_Network = Virtual_Network(config)
+        self._route:Route            = Route(self.INTERFACE, self.network.local_ip, None, socket.inet_aton(self.network.local_ip))
+        register_virtual_interface(Interface_Context(
+            interface      = self.INTERFACE,
+            address        = self.network.local_ip,
+            netmask        = self.network.netmask,
+            gateway        = None,
+            mac            = self.network.local_mac,
+            packed_address = socket.inet_aton(self.network.local_ip)
+        ))
+
+
+
+    @classmethod
+    def from_file(cls, path:str) -> 'Simulated_Transport':
+        with open(path, 'r') as file:
+            return cls(json.load(file))
+
+
+
+    def route(self, network:str) -> Route:
+        return self._route
+
+
+
+    def local_network(self) -> str:
+        return str(ipaddress.IPv4Network(f'{self.network.local_ip}/{self.network.netmask}', strict=False))
+
+
+
+    def layer_3_socket(self, interface:str=None) -> 'Virtual_Socket':
+        return Virtual_Socket(self.network, 'ip')
+
+
+
+    def icmp_socket(self, interface:str=None) -> 'Virtual_Socket':
+        return Virtual_Socket(self.network, 'icmp')
+
+
+
+    def layer_2_socket(self, interface:str) -> 'Virtual_Socket':
+        return Virtual_Socket(self.network, 'ether')
+
+
+
+    def tcp_socket(self) -> 'Virtual_Stream_Socket':
+        return Virtual_Stream_Socket(self.network)
+
+
+
+    def sniffer(self, data:Data, protocols:str, interface:str=None) -> 'Virtual_Sniffer':
+        return Virtual_Sniffer(data, self.network)
+
+
+
+    def resolver(self) -> 'Virtual_Resolver':
+        return Virtual_Resolver(self.network.names)
+
+
+
+    def pace(self, seconds:float) -> None:
+        self.network.advance(seconds)
+
+
+
+    def wait(self, seconds:float) -> None:
+        self.network.advance(seconds)
+        while self.network.has_due_frames():
+            time.sleep(0.001)
+
+
+
+
+# RESOLVER ===================================================================================================
+
+class Virtual_Resolver(DNS_Resolver):
+
+    __slots__ = ('_names', '_addresses')
+
+    def __init__(self, names:dict[str, str]) -> None:
+        super().__init__()
+        self._names:dict     = names
+        self._addresses:dict = {name: ip for ip, name in names.items()}
+
+
+
+    def _resolve(self, kind:str, queries:list[str], lookup:callable, default:str|None) -> dict:
+        table:dict = self._names if kind == 'PTR' else self._addresses
+        return {query: table.get(query, default) for query in queries}
+
+
+
+
+# SOCKET AND SNIFFER =========================================================================================
+
+class Virtual_Socket:
+
+    __slots__ = ('_network', '_kind')
+
+    def __init__(self, network:'Virtual_Network', kind:str) -> None:
+        self._network:Virtual_Network = network
+        self._kind:str                = kind
+
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+
+    def sendto(self, data:bytes, address:tuple) -> int:
+        self._network.receive(self._kind, bytes(data), address)
+        return len(data)
+
+
+
+    def send(self, data:bytes) -> int:
+        return self.sendto(data, None)
+
+
+
+    def close(self) -> None: ...
+
+
+
+class Virtual_Stream_Socket:
+
+    __slots__ = ('_network', '_pipe')
+
+    def __init__(self, network:'Virtual_Network') -> None:
+        self._network:Virtual_Network = network
+        self._pipe:tuple[int, int]    = None
+
+
+
+    def setblocking(self, flag:bool) -> None: ...
+
+    def setsockopt(self, *args) -> None: ...
+
+
+
+    def connect_ex(self, address:tuple) -> int:
+        result:int|None = self._network.connect(*address)
+        if result is not None: return result
+
+        # Nothing answers, the read end of a pipe never becomes writable so the connection times out
+        self._pipe = os.pipe()
+        return errno.EINPROGRESS
+
+
+
+    def fileno(self) -> int:
+        return self._pipe[0] if self._pipe else -1
+
+
+
+    def getsockopt(self, *args) -> int:
+        return errno.ETIMEDOUT
+
+
+
+    def close(self) -> None:
+        if self._pipe is None: return
+        for descriptor in self._pipe:
+            os.close(descriptor)
+        self._pipe = None
+
+
+
+
+class Virtual_Sniffer:
+
+    __slots__ = ('_data', '_network', '_running', '_thread')
+
+    def __init__(self, data:Data, network:'Virtual_Network') -> None:
+        self._data:Data               = data
+        self._network:Virtual_Network = network
+        self._running:bool            = True
+        self._thread:Thread           = Thread(target=self._sniff)
+
+
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+
+    def _sniff(self) -> None:
+        with self._data.metrics.stage('sniffing'):
+            while self._running:
+                frames:list[bytes] = self._network.due_frames()
+                if not frames:
+                    time.sleep(0.001)
+                    continue
+
+                self._data.raw_packets.extend(frames)
+                self._data.metrics.count('frames_received', len(frames))
+                self._data.metrics.count('frames_accepted', len(frames))
+
+
+
+    def stop_sniffing(self) -> None:
+        self._running = False
+        self._thread.join()
+
+
+
+
+# VIRTUAL NETWORK ============================================================================================
+
+_ETHER_STRUCT:struct.Struct = struct.Struct('!6s6sH')
+_IP_STRUCT:struct.Struct    = struct.Struct('!BBHHHBBH4s4s')
+_TCP_STRUCT:struct.Struct   = struct.Struct('!HHLLBBHHH')
+_ICMP_STRUCT:struct.Struct  = struct.Struct('!BBHHH')
+_ARP_STRUCT:struct.Struct   = struct.Struct('!HHBBH6s4s6s4s')
+_TCP_OPTIONS:dict           = {
+    'M': b'\x02\x04\x05\xb4', 'N': b'\x01', 'W': b'\x03\x03\x07', 'S': b'\x04\x02', 'T': b'\x08\x0a' + bytes(8), 'E': b'\x00'
+}
+_OPTION_LETTERS:dict        = {2: 'M', 3: 'W', 4: 'S', 8: 'T'}
+
+
+class Virtual_Network:
+
+    __slots__ = (
+        'local_ip', 'local_mac', 'netmask', 'names', '_local_mac', '_hosts', '_networks',
+        '_random', '_icmp_rate', '_icmp_tokens', '_icmp_refill', '_clock', '_pending', '_sequence', '_lock'
+    )
+
+    def __init__(self, config:dict) -> None:
+        local:dict    = config.get('local', {})
+        defaults:dict = config.get('defaults', {})
+
+        self.local_ip:str        = local.get('ip', '10.0.0.1')
+        self.local_mac:str       = local.get('mac', '02:00:0a:00:00:01')
+        self.netmask:str         = local.get('netmask', '255.255.255.0')
+        self._local_mac:bytes    = bytes.fromhex(self.local_mac.replace(':', ''))
+        self.names:dict          = {host['ip']: host['name'] for host in config.get('hosts', []) if host.get('name')}
+        self._hosts:dict         = {host['ip']: self._create_host(host, defaults) for host in config.get('hosts', [])}
+        self._networks:list      = [
+            (ipaddress.IPv4Network(network['cidr']), network.get('alive', 1.0), self._create_host(network, defaults))
+            for network in config.get('networks', [])
+        ]
+        self._random:random.Random = random.Random(config.get('seed', 0))
+        self._icmp_rate:float      = config.get('icmp_rate')
+        self._icmp_tokens:float    = self._icmp_rate or 0
+        self._icmp_refill:float    = 0.0
+        self._clock:float          = 0.0
+        self._pending:list         = []
+        self._sequence:int         = 0
+        self._lock:Lock            = Lock()
+
+
+
+    @staticmethod
+    def _create_host(spec:dict, defaults:dict) -> dict:
+        spec:dict = {**defaults, **spec}
+        ports     = lambda name: set(Port_Set.get_ports(str(spec[name]))) if spec.get(name) else set()
+        return {
+            'mac':          spec.get('mac'),
+            'tcp_open':     ports('tcp_open'),
+            'tcp_filtered': ports('tcp_filtered'),
+            'udp_open':     ports('udp_open'),
+            'udp_filtered': ports('udp_filtered'),
+            'closed':       spec.get('closed', 'closed'),
+            'latency':      spec.get('latency', 0.001),
+            'loss':         spec.get('loss', 0.0),
+            'ttl':          spec.get('ttl', 64),
+            'window':       spec.get('window', 64240),
+            'icmp':         spec.get('icmp', True),
+            'hops':         spec.get('hops', []),
+            'tcp_options':  [option for option in spec.get('tcp_options', '').split(',') if option]
+        }
+
+
+
+    @staticmethod
+    def _encode_tcp_options(layout:list[str], offered:set[str]) -> bytes:
+        options:list = []
+        padding:list = []
+        for option in layout:
+            if option == 'N':
+                padding.append(option)
+                continue
+            if option in offered or option in ('M', 'E'):
+                options.extend(padding)
+                options.append(option)
+            padding = []
+
+        encoded:bytes = b''.join(_TCP_OPTIONS[option] for option in options)
+        return encoded + bytes(-len(encoded) % 4)
+
+
+
+    @staticmethod
+    def _offered_tcp_options(segment:bytes) -> set[str]:
+        offered:set = set()
+        start:int   = 20
+        end:int     = min((segment[12] >> 4) * 4, len(segment))
+        while start < end:
+            kind:int = segment[start]
+            if kind == 0: break
+            offered.add(_OPTION_LETTERS.get(kind, '?'))
+            start += 1 if kind == 1 else max(segment[start + 1], 2)
+        return offered
+
+
+
+    def _find_host(self, ip:str) -> dict|None:
+        if ip in self._hosts:
+            return self._hosts[ip]
+
+        address:ipaddress.IPv4Address = ipaddress.IPv4Address(ip)
+        for network, alive, host in self._networks:
+            if address in network and zlib.crc32(ip.encode()) / 0xFFFFFFFF < alive:
+                return host
+        return None
+
+
+
+    def _find_route(self, ip:str) -> dict|None:
+        if ip in self._hosts:
+            return self._hosts[ip]
+
+        address:ipaddress.IPv4Address = ipaddress.IPv4Address(ip)
+        return next((host for network, _, host in self._networks if address in network), None)
+
+
+
+    @staticmethod
+    def _host_mac(ip:str, host:dict) -> bytes:
+        if host['mac']:
+            return bytes.fromhex(host['mac'].replace(':', ''))
+        return b'\x02\x00' + socket.inet_aton(ip)
+
+
+
+    # PROBES =================================================================================================
+
+    def receive(self, kind:str, data:bytes, address:tuple|None) -> None:
+        match kind:
+            case 'ip':    self._receive_ip_packet(data)
+            case 'icmp':  self._receive_echo_request(data, address[0])
+            case 'ether': self._receive_frame(data)
+
+
+
+    def _receive_ip_packet(self, packet:bytes) -> None:
+        destination:str = socket.inet_ntoa(packet[16:20])
+        route:dict      = self._find_route(destination)
+        if route is None or self._is_lost(route): return
+
+        # The routers answer for the whole network, whether the destination exists or not
+        if packet[8] <= len(route['hops']):
+            return self._answer_time_exceeded(route, packet)
+
+        host:dict = self._find_host(destination)
+        if host is None: return
+
+        segment:bytes      = packet[(packet[0] & 0x0F) * 4:]
+        src_port, dst_port = struct.unpack_from('!HH', segment)
+
+        match packet[9]:
+            case socket.IPPROTO_TCP:  self._answer_tcp(destination, host, segment, src_port, dst_port)
+            case socket.IPPROTO_UDP:  self._answer_udp(destination, host, packet, dst_port)
+            case socket.IPPROTO_ICMP: self._answer_echo(destination, host, segment)
+
+
+
+    def connect(self, ip:str, port:int) -> int|None:
+        host:dict = self._find_host(ip)
+        if host is None or port in host['tcp_filtered'] or self._is_lost(host): return None
+
+        if port in host['tcp_open']:   return 0
+        if host['closed'] == 'closed': return errno.ECONNREFUSED
+        return None
+
+
+
+    def _answer_tcp(self, ip:str, host:dict, segment:bytes, src_port:int, dst_port:int) -> None:
+        if dst_port in host['tcp_filtered']: return
+
+        if not segment[13] & 0x02:
+            flags:int = 0x04 if dst_port in host['tcp_open'] or host['closed'] == 'closed' else None
+            if flags is None: return
+        elif dst_port in host['tcp_open']:
+            flags:int = 0x12
+        elif host['closed'] == 'closed':
+            flags:int = 0x14
+        else:
+            return
+
+        options:bytes = self._encode_tcp_options(host['tcp_options'], self._offered_tcp_options(segment)) if flags == 0x12 else b''
+        sequence:int  = struct.unpack_from('!L', segment, 4)[0]
+        fields:list   = [
+            dst_port, src_port, zlib.crc32(segment[:4]), sequence + 1, (5 + len(options) // 4) << 4, flags, host['window'], 0, 0
+        ]
+        fields[7]     = Layer_4_Utils.checksum(
+            self._pseudo_header(ip, socket.IPPROTO_TCP, _TCP_STRUCT.size + len(options)) + _TCP_STRUCT.pack(*fields) + options
+        )
+        self._schedule(host, self._ip_frame(ip, host, socket.IPPROTO_TCP, _TCP_STRUCT.pack(*fields) + options))
+
+
+
+    def _answer_udp(self, ip:str, host:dict, packet:bytes, dst_port:int) -> None:
+        if dst_port in host['udp_open'] or dst_port in host['udp_filtered']: return
+        if host['closed'] != 'closed' or not self._take_icmp_token(): return
+
+        self._schedule(host, self._ip_frame(ip, host, socket.IPPROTO_ICMP, self._icmp_message(3, 3, 0, 0, packet[:28])))
+
+
+
+    def _answer_time_exceeded(self, host:dict, packet:bytes) -> None:
+        if not self._take_icmp_token(): return
+
+        router_ip:str = host['hops'][packet[8] - 1]
+        router:dict   = {**host, 'mac': None, 'ttl': 255}
+        self._schedule(router, self._ip_frame(router_ip, router, socket.IPPROTO_ICMP, self._icmp_message(11, 0, 0, 0, packet[:28])))
+
+
+
+    def _receive_echo_request(self, message:bytes, ip:str) -> None:
+        host:dict = self._find_host(ip)
+        if host is None or self._is_lost(host): return
+        self._answer_echo(ip, host, message)
+
+
+
+    def _answer_echo(self, ip:str, host:dict, message:bytes) -> None:
+        if not host['icmp'] or not self._take_icmp_token(): return
+
+        icmp_type, _, _, identifier, sequence = _ICMP_STRUCT.unpack_from(message)
+        match icmp_type:
+            case 8:  reply = self._icmp_message(0, 0, identifier, sequence, message[8:])
+            case 13: reply = self._icmp_message(14, 0, identifier, sequence, message[8:12] * 3)
+            case _:  return
+        self._schedule(host, self._ip_frame(ip, host, socket.IPPROTO_ICMP, reply))
+
+
+
+    def _receive_frame(self, frame:bytes) -> None:
+        if struct.unpack_from('!H', frame, 12)[0] != 0x0806: return
+
+        arp:tuple  = _ARP_STRUCT.unpack_from(frame, 14)
+        target:str = socket.inet_ntoa(arp[8])
+        host:dict  = self._find_host(target)
+        if arp[4] != 1 or host is None or self._is_lost(host): return
+
+        host_mac:bytes = self._host_mac(target, host)
+        reply:bytes    = _ARP_STRUCT.pack(1, 0x0800, 6, 4, 2, host_mac, arp[8], arp[5], arp[6])
+        self._schedule(host, _ETHER_STRUCT.pack(arp[5], host_mac, 0x0806) + reply)
+
+
+
+    def _is_lost(self, host:dict) -> bool:
+        if not host['loss']: return False
+        with self._lock:
+            return self._random.random() < host['loss']
+
+
+
+    def _take_icmp_token(self) -> bool:
+        if self._icmp_rate is None: return True
+
+        with self._lock:
+            self._icmp_tokens  = min(self._icmp_rate, self._icmp_tokens + (self._clock - self._icmp_refill) * self._icmp_rate)
+            self._icmp_refill  = self._clock
+            if self._icmp_tokens < 1: return False
+            self._icmp_tokens -= 1
+            return True
+
+
+
+    # REPLIES ================================================================================================
+
+    def _pseudo_header(self, source:str, protocol:int, length:int) -> bytes:
+        return struct.pack('!4s4sBBH', socket.inet_aton(source), socket.inet_aton(self.local_ip), 0, protocol, length)
+
+
+
+    def _ip_frame(self, source:str, host:dict, protocol:int, payload:bytes) -> bytes:
+        header:bytes = _IP_STRUCT.pack(
+            0x45, 0, 20 + len(payload), zlib.crc32(payload) & 0xFFFF, 0x4000, host['ttl'], protocol, 0,
+            socket.inet_aton(source), socket.inet_aton(self.local_ip)
+        )
+        header:bytes = header[:10] + struct.pack('!H', Layer_4_Utils.checksum(header)) + header[12:]
+        return _ETHER_STRUCT.pack(self._local_mac, self._host_mac(source, host), 0x0800) + header + payload
+
+
+
+    @staticmethod
+    def _icmp_message(icmp_type:int, code:int, identifier:int, sequence:int, payload:bytes) -> bytes:
+        header:bytes = _ICMP_STRUCT.pack(icmp_type, code, 0, identifier, sequence)
+        checksum:int = Layer_4_Utils.checksum(header + payload)
+        return _ICMP_STRUCT.pack(icmp_type, code, checksum, identifier, sequence) + payload
+
+
+
+    def _schedule(self, host:dict, frame:bytes) -> None:
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._pending, (self._clock + host['latency'], self._sequence, frame))
+
+
+
+    # VIRTUAL CLOCK ==========================================================================================
+    # Time only moves when the scanners pace their probes or wait for replies, so the same probes always
+    # get the same rate limits and losses, and no real time is spent sleeping
+
+    def advance(self, seconds:float) -> None:
+        with self._lock:
+            self._clock += seconds
+
+
+
+    def has_due_frames(self) -> bool:
+        with self._lock:
+            return bool(self._pending) and self._pending[0][0] <= self._clock
+
+
+
+    def due_frames(self) -> list[bytes]:
+        frames:list = []
+        with self._lock:
+            while self._pending and self._pending[0][0] <= self._clock:
+                frames.append(heapq.heappop(self._pending)[2])
+        return frames
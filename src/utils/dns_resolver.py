@@ -0,0 +1,151 @@
+import ipaddress
+import json
+import os
+import socket
+import time
+from queue              import Queue, Empty
+from threading          import Lock, Thread
+from utils.network_info import get_host_name
+
+
+class DNS_Resolver:
+
+    __slots__ = ('_timeout', '_workers', '_jobs', '_threads', '_ttl', '_negative_ttl', '_cache', '_cache_file', '_lock')
+
+    def __init__(self, timeout:float=2.0, workers:int=32, ttl:int=3600, negative_ttl:int=300) -> None:
+        self._timeout:float        = timeout
+        self._workers:int          = workers
+        self._jobs:Queue           = Queue()
+        self._threads:list[Thread] = []
+        self._ttl:int              = ttl
+        self._negative_ttl:int     = negative_ttl
+        self._cache:dict           = {}
+        self._cache_file:str       = None
+        self._lock:Lock            = Lock()
+
+
+
+    def reverse(self, ips:list[str]) -> dict[str, str]:
+        return self._resolve('PTR', ips, get_host_name, 'Unknown')
+
+
+
+    def forward(self, host_names:list[str]) -> dict[str, str|None]:
+        results:dict = {}
+        pending:list = []
+
+        for host in host_names:
+            if self._is_ip_address(host): results[host] = host
+            else:                         pending.append(host)
+
+        results.update(self._resolve('A', pending, self._forward_lookup, None))
+        return results
+
+
+
+    @staticmethod
+    def _is_ip_address(host:str) -> bool:
+        try:
+            ipaddress.IPv4Address(host)
+            return True
+        except ValueError:
+            return False
+
+
+
+    @staticmethod
+    def _forward_lookup(host_name:str) -> str|None:
+        try:   return socket.gethostbyname(host_name)
+        except Exception: return None
+
+
+
+    # RESOLUTION =============================================================================================
+
+    def _resolve(self, kind:str, queries:list[str], lookup:callable, default:str|None) -> dict:
+        results:dict = {}
+        pending:list = []
+        now:float    = time.time()
+
+        for query in dict.fromkeys(queries):
+            cached:list = self._cache.get(f'{kind}:{query}')
+            if cached and cached[1] > now: results[query] = cached[0]
+            else:                          pending.append(query)
+
+        results.update(self._resolve_pending(kind, pending, lookup, default))
+        return results
+
+
+
+    def _resolve_pending(self, kind:str, queries:list[str], lookup:callable, default:str|None) -> dict:
+        deadline:float = time.monotonic() + self._timeout
+        replies:Queue  = Queue()
+        answers:dict   = {}
+
+        self._start_workers(len(queries))
+        for query in queries:
+            self._jobs.put((kind, query, lookup, default, deadline, replies))
+
+        # The whole call shares one deadline, queries still queued when it passes are dropped by the workers.
+        # A lookup that times out keeps its worker until the system resolver gives up, and its late answer
+        # still lands in the cache
+        while len(answers) < len(queries):
+            try:
+                query, value   = replies.get(timeout=max(0, deadline - time.monotonic()))
+                answers[query] = value
+            except Empty:
+                break
+
+        return {query: answers.get(query, default) for query in queries}
+
+
+
+    def _start_workers(self, pending:int) -> None:
+        with self._lock:
+            while len(self._threads) < min(self._workers, pending):
+                thread:Thread = Thread(target=self._work, name='dns', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+
+
+    def _work(self) -> None:
+        while True:
+            kind, query, lookup, default, deadline, replies = self._jobs.get()
+            if time.monotonic() > deadline: continue
+
+            value = lookup(query)
+            self._store(kind, query, value, default)
+            replies.put((query, value))
+
+
+
+    def _store(self, kind:str, query:str, value:str|None, default:str|None) -> None:
+        ttl:int = self._ttl if value not in (default, None) else self._negative_ttl
+        with self._lock:
+            self._cache[f'{kind}:{query}'] = [value, time.time() + ttl]
+
+
+
+    # PERSISTENCE ============================================================================================
+
+    def load_cache(self, cache_file:str) -> None:
+        self._cache_file = cache_file
+        if not os.path.exists(cache_file): return
+
+        try:
+            with open(cache_file, 'r') as file:
+                self._cache.update(json.load(file))
+        except (OSError, ValueError):
+            return
+
+
+
+    def save_cache(self) -> None:
+        if self._cache_file is None: return
+
+        now:float   = time.time()
+        with self._lock:
+            valid:dict = {key: entry for key, entry in self._cache.items() if entry[1] > now}
+        with open(self._cache_file, 'w') as file:
+            json.dump(valid, file)
@@ -0,0 +1,163 @@
+from collections import deque
+
+
+def http_request(method:str, host:str, path:str) -> bytes:
+    return f'{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n'.encode()
+
+
+
+class HTTP_Response_Parser:
+
+    __slots__ = ('_buffer', '_methods', '_current')
+
+    def __init__(self) -> None:
+        self._buffer:bytearray = bytearray()
+        self._methods:deque    = deque()
+        self._current:dict     = None
+
+
+
+    @property
+    def pending(self) -> int:
+        return len(self._methods)
+
+
+
+    def expect(self, method:str) -> None:
+        self._methods.append(method)
+
+
+
+    def feed(self, data:bytes) -> list[dict]:
+        self._buffer.extend(data)
+        completed:list = []
+
+        while self._methods:
+            if self._current is None and not self._parse_head():
+                break
+
+            if not self._read_body():
+                break
+
+            completed.append(self._current)
+            self._methods.popleft()
+            self._current = None
+
+        return completed
+
+
+
+    def finish(self) -> list[dict]:
+        if self._current is None or self._current['framing'] != 'close':
+            return []
+
+        self._current['body_length'] += len(self._buffer)
+        self._buffer.clear()
+        self._methods.popleft()
+        response, self._current = self._current, None
+        return [response]
+
+
+
+    # HEAD ===================================================================================================
+
+    def _parse_head(self) -> bool:
+        end:int = self._buffer.find(b'\r\n\r\n')
+        if end < 0: return False
+
+        lines:list = self._buffer[:end].decode(errors='ignore').split('\r\n')
+        del self._buffer[:end + 4]
+
+        headers:dict = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        framing, length = self._get_framing(lines[0], headers)
+        self._current   = {
+            'status_line': lines[0],
+            'headers':     lines[1:],
+            'keep_alive':  framing != 'close' and self._is_keep_alive(lines[0], headers),
+            'framing':     framing,
+            'remaining':   length,
+            'body_length': 0
+        }
+        return True
+
+
+
+    def _get_framing(self, status_line:str, headers:dict) -> tuple[str, int]:
+        try:   status_code:int = int(status_line.split()[1])
+        except (IndexError, ValueError): status_code = 0
+
+        if self._methods[0] == 'HEAD' or 100 <= status_code < 200 or status_code in (204, 304):
+            return 'length', 0
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            return 'chunked', None
+
+        if headers.get('content-length', '').isdigit():
+            return 'length', int(headers['content-length'])
+
+        return 'close', None
+
+
+
+    @staticmethod
+    def _is_keep_alive(status_line:str, headers:dict) -> bool:
+        connection:str = headers.get('connection', '').lower()
+        if status_line.startswith('HTTP/1.0'):
+            return 'keep-alive' in connection
+        return 'close' not in connection
+
+
+
+    # BODY ===================================================================================================
+
+    def _read_body(self) -> bool:
+        match self._current['framing']:
+            case 'length':  return self._read_sized_body()
+            case 'chunked': return self._read_chunked_body()
+            case _:         return False
+
+
+
+    def _read_sized_body(self) -> bool:
+        size:int = min(self._current['remaining'], len(self._buffer))
+        del self._buffer[:size]
+        self._current['remaining']   -= size
+        self._current['body_length'] += size
+        return self._current['remaining'] == 0
+
+
+
+    def _read_chunked_body(self) -> bool:
+        while True:
+            if self._current['remaining']:
+                if not self._read_sized_body(): return False
+                continue
+
+            end:int = self._buffer.find(b'\r\n')
+            if end < 0: return False
+
+            size_line:str = self._buffer[:end].decode(errors='ignore').split(';')[0].strip()
+
+            if size_line == '':
+                del self._buffer[:end + 2]
+                continue
+
+            chunk_size:int = int(size_line, 16)
+            if chunk_size == 0:
+                return self._read_trailer(end)
+
+            del self._buffer[:end + 2]
+            self._current['remaining'] = chunk_size
+
+
+
+    def _read_trailer(self, size_line_end:int) -> bool:
+        trailer_end:int = self._buffer.find(b'\r\n\r\n', size_line_end)
+        if trailer_end < 0: return False
+
+        del self._buffer[:trailer_end + 4]
+        return True
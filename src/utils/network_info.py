@@ -1,23 +1,70 @@
 import socket
 import fcntl
 import struct
-import subprocess
 import ipaddress
+from dataclasses import dataclass
+from functools   import cache
 
 
-def get_default_iface() -> str:
-    result:subprocess.CompletedProcess[str] = subprocess.run(
-        "ip route | awk '/default/ {print $5}'",
-        shell=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
+@dataclass(frozen=True, slots=True)
+class Interface_Context:
+    interface:str
+    address:str
+    netmask:str
+    gateway:str
+    mac:str
+    packed_address:bytes
+
+
+
+_VIRTUAL_INTERFACES:dict = {}
+
+
+def register_virtual_interface(context:Interface_Context) -> None:
+    _VIRTUAL_INTERFACES[context.interface] = context
+
+
+
+def get_interface_context(interface:str=None) -> Interface_Context:
+    if interface in _VIRTUAL_INTERFACES:
+        return _VIRTUAL_INTERFACES[interface]
+    return _read_interface_context(interface)
+
+
+
+@cache
+def _read_interface_context(interface:str=None) -> Interface_Context:
+    interface, gateway = _read_default_route(interface)
+    address:str        = temporary_socket(0x8915, interface)
+    return Interface_Context(
+        interface      = interface,
+        address        = address,
+        netmask        = temporary_socket(0x891b, interface),
+        gateway        = gateway,
+        mac            = _read_mac_address(interface),
+        packed_address = socket.inet_aton(address)
     )
-    return result.stdout.strip()
 
 
 
-def temporary_socket(OP_CODE:int, INTERFACE=get_default_iface()) -> str:
+def _read_default_route(interface:str=None, route_file:str='/proc/net/route') -> tuple[str, str|None]:
+    with open(route_file, 'r') as file:
+        next(file)
+        for line in file:
+            fields:list = line.split()
+            if interface not in (None, fields[0]): continue
+
+            if fields[1] == '00000000' and int(fields[3], 16) & 0x2:
+                gateway:str = socket.inet_ntoa(struct.pack('<I', int(fields[2], 16)))
+                return fields[0], gateway
+
+    if interface is not None:
+        return interface, None
+    raise OSError('No default route found')
+
+
+
+def temporary_socket(OP_CODE:int, INTERFACE:str) -> str:
     with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
         return socket.inet_ntoa(
             fcntl.ioctl(sock.fileno(), OP_CODE,
@@ -26,18 +73,42 @@ def temporary_socket(OP_CODE:int, INTERFACE=get_default_iface()) -> str:
 
 
 
+def _read_mac_address(interface:str) -> str:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        info:bytes = fcntl.ioctl(sock.fileno(), 0x8927, struct.pack('256s', interface[:15].encode('utf-8')))
+        return ':'.join('%02x' % b for b in info[18:24])
+
+
+
+def get_default_iface() -> str:
+    return get_interface_context().interface
+
+
+
 def get_my_ip_address() -> str|None:
-    try:   return temporary_socket(0x8915)
+    try:   return get_interface_context().address
     except Exception: return None
 
 
 
 def get_subnet_mask() -> str|None:
-    try:   return temporary_socket(0x891b)
+    try:   return get_interface_context().netmask
+    except Exception: return None
+
+
+
+def get_my_mac_address() -> str|None:
+    try:   return get_interface_context().mac
     except Exception: return None
 
 
 
+def get_local_network() -> str:
+    network:ipaddress.IPv4Network = ipaddress.IPv4Network(f'{get_my_ip_address()}/{get_subnet_mask()}', strict=False)
+    return str(network)
+
+
+
 def get_ip_range() -> list[str]:
     my_ip_address:str              = get_my_ip_address()
     ip_range:ipaddress.IPv4Network = ipaddress.IPv4Network(f'{my_ip_address}/{get_subnet_mask()}', strict=False)
@@ -0,0 +1,37 @@
+class OS_Fingerprint:
+
+    # Initial TTL, SYN-ACK window and TCP option layout (M=MSS N=NOP W=window scale S=SACK T=timestamp E=end)
+    _SIGNATURES:tuple = (
+        (64,  65160, 'M,S,T,N,W',         'Linux 4.x+'),
+        (64,  28960, 'M,S,T,N,W',         'Linux 3.x'),
+        (64,  14480, 'M,S,T,N,W',         'Linux 2.6'),
+        (64,  5792,  'M,S,T,N,W',         'Linux 2.4'),
+        (64,  65535, 'M,N,W,N,N,T,S,E',   'macOS / iOS'),
+        (64,  65535, 'M,N,W,S,T',         'FreeBSD'),
+        (64,  16384, 'M,N,N,S,N,W,N,N,T', 'OpenBSD'),
+        (64,  5840,  'M',                 'Embedded Linux'),
+        (128, 65535, 'M,N,W,N,N,S',       'Windows 10/11'),
+        (128, 64240, 'M,N,W,N,N,S',       'Windows 10/11'),
+        (128, 8192,  'M,N,W,N,N,S',       'Windows 7 / Server 2008'),
+        (128, 8192,  'M,N,W,S',           'Windows Vista'),
+        (128, 16384, 'M,N,N,S',           'Windows XP / Server 2003'),
+        (255, 4128,  'M',                 'Cisco IOS'),
+        (255, 49232, 'N,N,T,M,N,W,N,N,S', 'Solaris'),
+    )
+    _FAMILIES:dict = {32: 'Windows 9x', 64: 'Linux/Unix', 128: 'Windows', 255: 'Network device'}
+
+    _EXACT_INDEX:dict  = {(ttl, window, layout): name for ttl, window, layout, name in reversed(_SIGNATURES)}
+    _LAYOUT_INDEX:dict = {(ttl, layout): name for ttl, _, layout, name in reversed(_SIGNATURES)}
+
+
+    @classmethod
+    def guess(cls, signature:tuple|None) -> str|None:
+        if signature is None: return None
+
+        ttl, window, layout = signature
+        initial_ttl:int     = next((value for value in cls._FAMILIES if ttl <= value), 255)
+        return (
+            cls._EXACT_INDEX.get((initial_ttl, window, layout))
+            or cls._LAYOUT_INDEX.get((initial_ttl, layout))
+            or cls._FAMILIES[initial_ttl]
+        )
@@ -0,0 +1,53 @@
+import socket
+from collections import deque
+from threading   import Lock
+
+
+# Ethernet (14) + IP with options (60) + ICMP (8) + quoted IP with options (60) + quoted L4 header (8)
+SNAP_LENGTH:int = 150
+
+
+class Packet_Arena:
+
+    __slots__ = ('_slot_size', '_chunk_slots', '_chunks', '_free', '_in_use', '_lock')
+
+    def __init__(self, slot_size:int=SNAP_LENGTH, chunk_slots:int=4096) -> None:
+        self._slot_size:int   = slot_size
+        self._chunk_slots:int = chunk_slots
+        self._chunks:list     = []
+        self._free:deque      = deque()
+        self._in_use:dict     = {}
+        self._lock:Lock       = Lock()
+
+
+
+    def receive(self, sock:socket.socket) -> memoryview:
+        slot:memoryview  = self._acquire()
+        size:int         = sock.recv_into(slot, self._slot_size)
+        frame:memoryview = slot[:size]
+        self._in_use[id(frame)] = slot
+        return frame
+
+
+
+    def release(self, frame:object) -> None:
+        slot:memoryview = self._in_use.pop(id(frame), None)
+        if slot is not None:
+            self._free.append(slot)
+
+
+
+    def _acquire(self) -> memoryview:
+        try:
+            return self._free.popleft()
+        except IndexError:
+            with self._lock:
+                if not self._free: self._grow()
+            return self._acquire()
+
+
+
+    def _grow(self) -> None:
+        chunk:memoryview = memoryview(bytearray(self._slot_size * self._chunk_slots))
+        self._chunks.append(chunk)
+        self._free.extend(chunk[start : start + self._slot_size] for start in range(0, len(chunk), self._slot_size))
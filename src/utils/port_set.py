@@ -1,8 +1,11 @@
 import random
+from utils.services_db import Services_DB
 
 
 class Port_Set:
 
+    DEFAULT_TOP_PORTS:int = 100
+
     @staticmethod
     def get_random_port() -> int:
         return random.randint(10000, 65535)
@@ -10,11 +13,13 @@ class Port_Set:
 
 
     @staticmethod
-    def get_ports(port_str:str) -> dict:
+    def get_ports(port_str:str, protocol:str='TCP', top:int=None) -> list[int]:
+        services:Services_DB = Services_DB.load()
+        if top: return services.top_ports(protocol, top)
+
         match port_str:
-            case 'TCP': return list(Port_Set.TCP_PORTS.keys())
-            case 'UDP': return list(Port_Set.UDP_PORTS.keys())
-            case _:     return Port_Set._get_specific_ports(port_str)
+            case 'TCP' | 'UDP': return services.top_ports(port_str, Port_Set.DEFAULT_TOP_PORTS)
+            case _:             return services.order_by_likelihood(Port_Set._get_specific_ports(port_str), protocol)
 
 
 
@@ -36,7 +41,16 @@ class Port_Set:
 
     @staticmethod
     def get_tcp_port_description(port:int) -> str:
-        return Port_Set.TCP_PORTS.get(port, 'Ephemeral Port / Dynamic Port')
+        return Port_Set.TCP_PORTS.get(port) or Port_Set._get_service_name(port, 'TCP')
+
+
+
+    @staticmethod
+    def get_banner_protocol(port:int) -> str|None:
+        description:str = Port_Set.TCP_PORTS.get(port, '')
+        for protocol in ('HTTPS', 'HTTP', 'SSH', 'FTP'):
+            if description.startswith(protocol): return protocol.lower()
+        return None
 
 
 
@@ -108,7 +122,13 @@ class Port_Set:
 
     @staticmethod
     def get_udp_port_description(port:int) -> str:
-        return Port_Set.UDP_PORTS.get(port, 'Ephemeral Port / Dynamic Port')
+        return Port_Set.UDP_PORTS.get(port) or Port_Set._get_service_name(port, 'UDP')
+
+
+
+    @staticmethod
+    def _get_service_name(port:int, protocol:str) -> str:
+        return Services_DB.load().get_name(port, protocol) or 'Ephemeral Port / Dynamic Port'
 
 
 
@@ -0,0 +1,101 @@
+import csv
+import json
+import sys
+import time
+from threading import Thread, Event, Lock
+
+
+class Result_Writer:
+
+    FORMATS:tuple = ('jsonl', 'csv')
+    FIELDS:tuple  = ('time', 'ip', 'port', 'protocol', 'status', 'mac', 'ttl', 'hop')
+
+    __slots__ = ('_format', '_file', '_owns_file', '_csv', '_buffer', '_max_records', '_max_delay', '_last_flush', '_lock', '_stop', '_timer')
+
+    def __init__(self, output_format:str, path:str, max_records:int=256, max_delay:float=1.0) -> None:
+        if output_format not in self.FORMATS:
+            raise ValueError(f'Invalid output format: {output_format} (use {" or ".join(self.FORMATS)})')
+
+        self._format:str        = output_format
+        self._file              = sys.stdout if path == '-' else open(path, 'w', newline='')
+        self._owns_file:bool    = path != '-'
+        self._csv:csv.writer    = csv.writer(self._file) if output_format == 'csv' else None
+        self._buffer:list[dict] = []
+        self._max_records:int   = max_records
+        self._max_delay:float   = max_delay
+        self._last_flush:float  = time.monotonic()
+        self._lock:Lock         = Lock()
+        self._stop:Event        = Event()
+        self._timer:Thread      = Thread(target=self._flush_on_time, daemon=True)
+
+        if self._csv: self._csv.writerow(self.FIELDS)
+        self._timer.start()
+
+
+
+    @property
+    def uses_stdout(self) -> bool:
+        return not self._owns_file
+
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+
+    def write_response(self, protocol:str, info:tuple, ip:str=None) -> None:
+        match protocol:
+            case 'TCP':               record = {'ip': info[0], 'port': info[1], 'status': info[2]}
+            case 'UDP' if ip is None: record = {'ip': info[0], 'mac': info[1], 'status': 'UP'}
+            case 'UDP':               record = {'ip': ip, 'port': info, 'status': 'CLOSED'}
+            case 'ICMP'|'ARP':        record = {'ip': info[0], 'mac': info[1], 'status': 'UP'}
+            case 'TRACE':             record = {'ip': info[0], 'ttl': info[1], 'hop': info[2]}
+        self.write({'protocol': protocol, **record})
+
+
+
+    def write(self, record:dict) -> None:
+        with self._lock:
+            self._buffer.append({'time': round(time.time(), 3), **record})
+            if len(self._buffer) >= self._max_records or time.monotonic() - self._last_flush >= self._max_delay:
+                self._flush()
+
+
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+
+
+    def _flush_on_time(self) -> None:
+        while not self._stop.wait(self._max_delay / 4):
+            with self._lock:
+                if self._buffer and time.monotonic() - self._last_flush >= self._max_delay:
+                    self._flush()
+
+
+
+    def _flush(self) -> None:
+        if self._csv:
+            self._csv.writerows([record.get(name, '') for name in self.FIELDS] for record in self._buffer)
+        else:
+            self._file.writelines(json.dumps(record) + '\n' for record in self._buffer)
+
+        self._file.flush()
+        self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+
+
+    def close(self) -> None:
+        self._stop.set()
+        self._timer.join()
+        self.flush()
+        if self._owns_file:
+            self._file.close()
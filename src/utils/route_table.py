@@ -0,0 +1,94 @@
+import ipaddress
+import os
+import socket
+import struct
+from dataclasses        import dataclass
+from functools          import cache
+from utils.network_info import get_interface_context
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    interface:str
+    source:str
+    gateway:str|None
+    packed_source:bytes
+
+
+
+_NLMSG_HEADER:struct.Struct  = struct.Struct('=IHHII')
+_RTMSG_HEADER:struct.Struct  = struct.Struct('=BBBBBBBBI')
+_RTATTR_HEADER:struct.Struct = struct.Struct('=HH')
+
+_RTM_GETROUTE:int  = 26
+_NLM_F_REQUEST:int = 0x1
+_NLMSG_ERROR:int   = 0x2
+_RTA_DST:int       = 1
+_RTA_OIF:int       = 4
+_RTA_GATEWAY:int   = 5
+_RTA_PREFSRC:int   = 7
+
+
+
+@cache
+def get_route(network:str) -> Route:
+    target:ipaddress.IPv4Network = ipaddress.IPv4Network(network, strict=False)
+    probe:str                    = str(target[1] if target.num_addresses > 2 else target[0])
+    attributes:dict              = _query_kernel_route(probe)
+
+    interface:str = socket.if_indextoname(attributes[_RTA_OIF])
+    source:str    = attributes.get(_RTA_PREFSRC) or get_interface_context(interface).address
+    gateway:str   = attributes.get(_RTA_GATEWAY)
+    return Route(interface, source, gateway, socket.inet_aton(source))
+
+
+
+def group_by_route(networks:list[str], lookup:callable=get_route) -> dict[Route, list[str]]:
+    groups:dict = {}
+    for network in networks:
+        groups.setdefault(lookup(network), []).append(network)
+    return groups
+
+
+
+# RTNETLINK ==================================================================================================
+
+def _query_kernel_route(ip:str) -> dict:
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        sock.send(_build_route_request(ip))
+        reply:bytes = sock.recv(65536)
+
+    length, message_type, _, _, _ = _NLMSG_HEADER.unpack_from(reply)
+    if message_type == _NLMSG_ERROR:
+        error:int = -struct.unpack_from('=i', reply, _NLMSG_HEADER.size)[0]
+        raise OSError(error, f'No route to {ip}: {os.strerror(error)}')
+
+    return _parse_attributes(reply[_NLMSG_HEADER.size + _RTMSG_HEADER.size : length])
+
+
+
+def _build_route_request(ip:str) -> bytes:
+    rtmsg:bytes     = _RTMSG_HEADER.pack(socket.AF_INET, 32, 0, 0, 0, 0, 0, 0, 0)
+    attribute:bytes = _RTATTR_HEADER.pack(_RTATTR_HEADER.size + 4, _RTA_DST) + socket.inet_aton(ip)
+    length:int      = _NLMSG_HEADER.size + len(rtmsg) + len(attribute)
+    return _NLMSG_HEADER.pack(length, _RTM_GETROUTE, _NLM_F_REQUEST, 1, 0) + rtmsg + attribute
+
+
+
+def _parse_attributes(data:bytes) -> dict:
+    attributes:dict = {}
+    offset:int      = 0
+
+    while offset + _RTATTR_HEADER.size <= len(data):
+        length, attribute_type = _RTATTR_HEADER.unpack_from(data, offset)
+        if length < _RTATTR_HEADER.size: break
+
+        value:bytes = data[offset + _RTATTR_HEADER.size : offset + length]
+        match attribute_type:
+            case 4:     attributes[_RTA_OIF] = struct.unpack('=I', value)[0]
+            case 5 | 7: attributes[attribute_type] = socket.inet_ntoa(value)
+
+        offset += (length + 3) & ~3
+
+    return attributes
@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import time
+
+
+class Scan_History:
+
+    DEFAULT_FILE:str = 'netxplorer.db'
+
+    _SCHEMA:str = '''
+        CREATE TABLE IF NOT EXISTS scans (
+            id       INTEGER PRIMARY KEY,
+            command  TEXT NOT NULL,
+            target   TEXT,
+            started  REAL NOT NULL,
+            duration REAL,
+            metrics  TEXT
+        );
+        CREATE TABLE IF NOT EXISTS hosts (
+            scan_id   INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+            ip        TEXT NOT NULL,
+            mac       TEXT,
+            protocols TEXT,
+            PRIMARY KEY (scan_id, ip)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ports (
+            scan_id  INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+            ip       TEXT NOT NULL,
+            port     INTEGER NOT NULL,
+            protocol TEXT NOT NULL,
+            status   TEXT NOT NULL,
+            PRIMARY KEY (scan_id, ip, port, protocol)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS banners (
+            scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+            ip      TEXT NOT NULL,
+            port    INTEGER NOT NULL,
+            status  TEXT NOT NULL,
+            service TEXT,
+            banner  TEXT,
+            PRIMARY KEY (scan_id, ip, port)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS hosts_by_ip     ON hosts (ip, scan_id);
+        CREATE INDEX IF NOT EXISTS ports_by_target ON ports (ip, port, scan_id);
+        CREATE INDEX IF NOT EXISTS banners_by_port ON banners (ip, port, scan_id);
+    '''
+
+    __slots__ = ('_connection',)
+
+    def __init__(self, path:str=DEFAULT_FILE) -> None:
+        self._connection:sqlite3.Connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(self._SCHEMA)
+
+
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+
+    # WRITING ================================================================================================
+
+    def save_scan(self, command:str, target:str, metrics:dict,
+                  hosts:list[tuple]=(), ports:list[tuple]=(), banners:list[tuple]=()) -> int:
+        with self._connection:
+            scan_id:int = self._connection.execute(
+                'INSERT INTO scans (command, target, started, duration, metrics) VALUES (?, ?, ?, ?, ?)',
+                (command, target, time.time() - metrics['total_wall_time'], metrics['total_wall_time'], json.dumps(metrics))
+            ).lastrowid
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO hosts VALUES (?, ?, ?, ?)', ((scan_id, *host) for host in hosts)
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO ports VALUES (?, ?, ?, ?, ?)', ((scan_id, *port) for port in ports)
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO banners VALUES (?, ?, ?, ?, ?, ?)', ((scan_id, *banner) for banner in banners)
+            )
+        return scan_id
+
+
+
+    # READING ================================================================================================
+
+    def list_scans(self, limit:int=20) -> list[tuple]:
+        return self._connection.execute(
+            'SELECT id, command, target, started, duration FROM scans ORDER BY id DESC LIMIT ?', (limit,)
+        ).fetchall()
+
+
+
+    def resolve_scan_id(self, reference:str, command:str=None) -> int:
+        if reference == 'last' or reference.startswith('last~'):
+            row:tuple = self._connection.execute(
+                'SELECT id FROM scans WHERE :command IS NULL OR command = :command ORDER BY id DESC LIMIT 1 OFFSET :offset',
+                {'command': command, 'offset': int(reference[5:] or 0)}
+            ).fetchone()
+        else:
+            row:tuple = self._connection.execute('SELECT id FROM scans WHERE id = ?', (int(reference),)).fetchone()
+
+        if row is None:
+            raise ValueError(f'Scan not found: {reference}')
+        return row[0]
+
+
+
+    def get_command(self, scan_id:int) -> str:
+        return self._connection.execute('SELECT command FROM scans WHERE id = ?', (scan_id,)).fetchone()[0]
+
+
+
+    def diff(self, old_scan:int, new_scan:int) -> dict[str, list[tuple]]:
+        scans:dict = {'old': old_scan, 'new': new_scan}
+        return {name: self._connection.execute(query, scans).fetchall() for name, query in _DIFF_QUERIES.items()}
+
+
+
+
+
+def _missing(table:str, columns:str, key:str, first:str, second:str) -> str:
+    join:str = ' AND '.join(f'{second}.{column} = {first}.{column}' for column in key.split(', '))
+    return (
+        f'SELECT {", ".join(f"{first}.{column}" for column in columns.split(", "))} FROM {table} {first} '
+        f'WHERE {first}.scan_id = :{first} AND NOT EXISTS '
+        f'(SELECT 1 FROM {table} {second} WHERE {second}.scan_id = :{second} AND {join})'
+    )
+
+
+
+def _changed(table:str, key:str, column:str) -> str:
+    join:str = ' AND '.join(f'new.{name} = old.{name}' for name in key.split(', '))
+    return (
+        f'SELECT {", ".join(f"old.{name}" for name in key.split(", "))}, old.{column}, new.{column} '
+        f'FROM {table} old JOIN {table} new ON new.scan_id = :new AND {join} '
+        f'WHERE old.scan_id = :old AND old.{column} IS NOT new.{column}'
+    )
+
+
+
+_DIFF_QUERIES:dict = {
+    'hosts_added':     _missing('hosts', 'ip, mac', 'ip', 'new', 'old'),
+    'hosts_removed':   _missing('hosts', 'ip, mac', 'ip', 'old', 'new'),
+    'mac_changed':     _changed('hosts', 'ip', 'mac'),
+    'ports_added':     _missing('ports', 'ip, port, protocol, status', 'ip, port, protocol', 'new', 'old'),
+    'ports_removed':   _missing('ports', 'ip, port, protocol, status', 'ip, port, protocol', 'old', 'new'),
+    'status_changed':  _changed('ports', 'ip, port, protocol', 'status'),
+    'banners_changed': _changed('banners', 'ip, port', 'banner'),
+}
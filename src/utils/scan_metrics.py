@@ -0,0 +1,108 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from threading  import Lock
+
+
+class Scan_Metrics:
+
+    COUNTERS:tuple = (
+        'probes_built', 'probes_sent', 'send_errors', 'frames_received',
+        'frames_accepted', 'kernel_drops', 'frames_dissected', 'dissect_errors'
+    )
+
+    __slots__ = ('_counters', '_stages', '_started', '_output_file', '_lock', 'profiler')
+
+    def __init__(self) -> None:
+        self._counters:dict   = dict.fromkeys(self.COUNTERS, 0)
+        self._stages:dict     = {}
+        self._started:float   = time.perf_counter()
+        self._output_file:str = None
+        self._lock:Lock       = Lock()
+        self.profiler:object  = None
+
+
+
+    def count(self, name:str, amount:int=1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+
+
+    def counter(self, name:str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+
+
+    @contextmanager
+    def stage(self, name:str):
+        with self.profiler.profile(name) if self.profiler else nullcontext():
+            wall_start:float = time.perf_counter()
+            cpu_start:float  = time.process_time()
+            try:
+                yield
+            finally:
+                self._add_stage(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+
+
+    def _add_stage(self, name:str, wall_time:float, cpu_time:float) -> None:
+        with self._lock:
+            stage:dict      = self._stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            stage['wall']  += wall_time
+            stage['cpu']   += cpu_time
+            stage['calls'] += 1
+
+
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters:dict = dict(self._counters)
+            stages:dict   = {name: dict(stage) for name, stage in self._stages.items()}
+
+        sending_time:float = stages.get('sending', {}).get('wall', 0)
+        return {
+            'counters':        counters,
+            'probes_per_sec':  round(counters['probes_sent'] / sending_time, 1) if sending_time else 0,
+            'stages':          stages,
+            'total_wall_time': time.perf_counter() - self._started
+        }
+
+
+
+    # REPORT =================================================================================================
+
+    def set_output(self, output_file:str) -> None:
+        self._output_file = output_file
+
+
+
+    def report(self) -> None:
+        metrics:dict = self.snapshot()
+        self._display(metrics)
+        if self.profiler is not None:
+            self.profiler.report(metrics['stages'])
+
+        if self._output_file is None: return
+        with open(self._output_file, 'w') as file:
+            json.dump(metrics, file, indent=2)
+
+
+
+    @staticmethod
+    def _display(metrics:dict) -> None:
+        counters:dict = {name: value for name, value in metrics['counters'].items() if value}
+        stages:str    = '  '.join(
+            f'{name} {stage["wall"]:.2f}s (cpu {stage["cpu"]:.2f}s)' for name, stage in metrics['stages'].items()
+        )
+
+        if not counters and not stages: return
+
+        print(f'-- Metrics ({metrics["total_wall_time"]:.2f}s) --')
+        if counters:
+            print('  '.join(f'{name.replace("_", " ")}: {value}' for name, value in counters.items()))
+        if metrics['probes_per_sec']:
+            print(f'probes/s: {metrics["probes_per_sec"]}')
+        if stages:
+            print(stages)
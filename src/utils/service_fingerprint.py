@@ -0,0 +1,85 @@
+import re
+
+
+class Service_Fingerprint:
+
+    _MATCHER:re.Pattern = None
+
+
+    @classmethod
+    def match(cls, banner:str) -> dict|None:
+        if cls._MATCHER is None:
+            cls._compile_signatures()
+
+        match:re.Match = cls._MATCHER.search(banner)
+        if match is None: return None
+
+        index:int        = int(match.lastgroup[1:])
+        product, cpe     = cls.SIGNATURES[index][1:]
+        version:str|None = match.groupdict().get(f'v{index}')
+
+        return {
+            'product': product,
+            'version': version,
+            'cpe':     f'{cpe}:{version}' if version else cpe
+        }
+
+
+
+    @classmethod
+    def _compile_signatures(cls) -> None:
+        alternatives:list = []
+        for index, (pattern, _, _) in enumerate(cls.SIGNATURES):
+            pattern:str = pattern.replace('{version}', f'(?P<v{index}>[\\w.\\-]+)')
+            alternatives.append(f'(?P<s{index}>{pattern})')
+
+        cls._MATCHER = re.compile('|'.join(alternatives), re.IGNORECASE | re.MULTILINE)
+
+
+
+    # Signatures may only use non-capturing groups; {version} becomes the version group.
+    SIGNATURES = [
+        # SSH ======================
+        (r'SSH-[\d.]+-OpenSSH[_-]{version}',                'OpenSSH',                     'cpe:/a:openbsd:openssh'),
+        (r'SSH-[\d.]+-dropbear[_-]?{version}?',             'Dropbear SSH',                'cpe:/a:matt_johnston:dropbear_ssh_server'),
+        (r'SSH-[\d.]+-libssh[_-]{version}',                 'libssh',                      'cpe:/a:libssh:libssh'),
+        (r'SSH-[\d.]+-Cisco-{version}',                     'Cisco SSH',                   'cpe:/o:cisco:ios'),
+        (r'SSH-[\d.]+-ROSSSH',                              'MikroTik RouterOS SSH',       'cpe:/o:mikrotik:routeros'),
+        (r'SSH-[\d.]+-mod_sftp(?:/{version})?',             'ProFTPD mod_sftp',            'cpe:/a:proftpd:proftpd'),
+        (r'SSH-[\d.]+-Go',                                  'Go x/crypto SSH',             'cpe:/a:golang:go'),
+        # FTP ======================
+        (r'\(vsFTPd {version}\)',                           'vsftpd',                      'cpe:/a:beasts:vsftpd'),
+        (r'ProFTPD {version}',                              'ProFTPD',                     'cpe:/a:proftpd:proftpd'),
+        (r'Pure-FTPd',                                      'Pure-FTPd',                   'cpe:/a:pureftpd:pure-ftpd'),
+        (r'FileZilla Server(?: version)? {version}',        'FileZilla Server',            'cpe:/a:filezilla-project:filezilla_server'),
+        (r'Microsoft FTP Service',                          'Microsoft IIS FTP',           'cpe:/a:microsoft:internet_information_services'),
+        (r'220[- ].*?wu-{version}',                         'WU-FTPD',                     'cpe:/a:washington_university:wu-ftpd'),
+        # SMTP =====================
+        (r'ESMTP Postfix',                                  'Postfix',                     'cpe:/a:postfix:postfix'),
+        (r'ESMTP Exim {version}',                           'Exim',                        'cpe:/a:exim:exim'),
+        (r'ESMTP Sendmail {version}',                       'Sendmail',                    'cpe:/a:sendmail:sendmail'),
+        # HTTP =====================
+        (r'^Server: nginx(?:/{version})?',                  'nginx',                       'cpe:/a:nginx:nginx'),
+        (r'^Server: openresty(?:/{version})?',              'OpenResty',                   'cpe:/a:openresty:openresty'),
+        (r'^Server: Apache-Coyote/{version}',               'Apache Tomcat (Coyote)',      'cpe:/a:apache:tomcat'),
+        (r'^Server: Apache(?:/{version})?',                 'Apache httpd',                'cpe:/a:apache:http_server'),
+        (r'^Server: Microsoft-IIS/{version}',               'Microsoft IIS',               'cpe:/a:microsoft:internet_information_services'),
+        (r'^Server: Microsoft-HTTPAPI/{version}',           'Microsoft HTTPAPI',           'cpe:/o:microsoft:windows'),
+        (r'^Server: lighttpd(?:/{version})?',               'lighttpd',                    'cpe:/a:lighttpd:lighttpd'),
+        (r'^Server: LiteSpeed',                             'LiteSpeed',                   'cpe:/a:litespeedtech:litespeed_web_server'),
+        (r'^Server: Caddy',                                 'Caddy',                       'cpe:/a:caddyserver:caddy'),
+        (r'^Server: Jetty\({version}\)',                    'Jetty',                       'cpe:/a:eclipse:jetty'),
+        (r'^Server: gunicorn(?:/{version})?',               'Gunicorn',                    'cpe:/a:gunicorn:gunicorn'),
+        (r'^Server: Werkzeug/{version}',                    'Werkzeug',                    'cpe:/a:palletsprojects:werkzeug'),
+        (r'^Server: Kestrel',                               'Kestrel',                     'cpe:/a:microsoft:asp.net_core'),
+        (r'^Server: cloudflare',                            'Cloudflare',                  'cpe:/a:cloudflare:cloudflare'),
+        (r'^Server: AmazonS3',                              'Amazon S3',                   'cpe:/a:amazon:s3'),
+        (r'^Server: Boa/{version}',                         'Boa',                         'cpe:/a:boa:boa'),
+        (r'^Server: mini_httpd(?:/{version})?',             'mini_httpd',                  'cpe:/a:acme:mini_httpd'),
+        (r'^Server: GoAhead-Webs',                          'GoAhead WebServer',           'cpe:/a:embedthis:goahead'),
+        (r'^Server: RouterOS',                              'MikroTik RouterOS',           'cpe:/o:mikrotik:routeros'),
+        (r'^Server: Python/[\d.]+ aiohttp/{version}',       'aiohttp',                     'cpe:/a:aiohttp:aiohttp'),
+        (r'^Server: SimpleHTTP/[\d.]+ Python/{version}',    'Python http.server',          'cpe:/a:python:python'),
+        (r'^Server: Webmin',                                'Webmin',                      'cpe:/a:webmin:webmin'),
+        (r'^Server: Synology',                              'Synology DSM',                'cpe:/o:synology:diskstation_manager'),
+    ]
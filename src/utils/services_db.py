@@ -0,0 +1,115 @@
+import os
+import struct
+from functools import cache
+from itertools import islice
+
+
+class Services_DB:
+
+    SOURCE_FILE:str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services.txt')
+    INDEX_FILE:str  = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services.idx')
+
+    # Index layout: header (magic, source mtime, records) + records ranked by frequency + newline separated names
+    _HEADER:struct.Struct = struct.Struct('!4sdI')
+    _RECORD:struct.Struct = struct.Struct('!HBf')
+    _MAGIC:bytes          = b'NXS1'
+    _PROTOCOLS:tuple      = ('tcp', 'udp')
+
+    __slots__ = ('_ranked', '_ranks', '_names')
+
+    def __init__(self, records:list[tuple[int, int, float, str]]) -> None:
+        self._ranked:dict = {protocol: [] for protocol in self._PROTOCOLS}
+        self._ranks:dict  = {protocol: {} for protocol in self._PROTOCOLS}
+        self._names:dict  = {protocol: {} for protocol in self._PROTOCOLS}
+
+        for port, protocol_code, _, name in records:
+            protocol:str = self._PROTOCOLS[protocol_code]
+            if port in self._ranks[protocol]: continue
+            self._ranks[protocol][port] = len(self._ranked[protocol])
+            self._ranked[protocol].append(port)
+            self._names[protocol][port] = name
+
+
+
+    @classmethod
+    @cache
+    def load(cls) -> 'Services_DB':
+        source_time:float = os.path.getmtime(cls.SOURCE_FILE)
+        try:
+            return cls(cls._read_index(source_time))
+        except (OSError, ValueError, struct.error):
+            return cls(cls._compile(source_time))
+
+
+
+    # QUERIES ================================================================================================
+
+    def top_ports(self, protocol:str, count:int) -> list[int]:
+        ranked:list = self._ranked[protocol.lower()][:count]
+        if len(ranked) < count:
+            ranks:dict = self._ranks[protocol.lower()]
+            ranked.extend(islice((port for port in range(1, 65536) if port not in ranks), count - len(ranked)))
+        return ranked
+
+
+
+    def order_by_likelihood(self, ports:list[int], protocol:str) -> list[int]:
+        ranks:dict   = self._ranks[protocol.lower()]
+        unranked:int = len(ranks)
+        return sorted(ports, key=lambda port: (ranks.get(port, unranked), port))
+
+
+
+    def get_name(self, port:int, protocol:str) -> str|None:
+        return self._names[protocol.lower()].get(port)
+
+
+
+    # INDEX ==================================================================================================
+
+    @classmethod
+    def _read_index(cls, source_time:float) -> list[tuple]:
+        with open(cls.INDEX_FILE, 'rb') as file:
+            content:bytes = file.read()
+
+        magic, index_time, count = cls._HEADER.unpack_from(content)
+        if magic != cls._MAGIC or index_time != source_time:
+            raise ValueError('Stale services index')
+
+        names_start:int = cls._HEADER.size + count * cls._RECORD.size
+        names:list      = content[names_start:].decode().split('\n')
+        return [
+            (*record, name)
+            for record, name in zip(cls._RECORD.iter_unpack(content[cls._HEADER.size : names_start]), names)
+        ]
+
+
+
+    @classmethod
+    def _compile(cls, source_time:float) -> list[tuple]:
+        records:list  = sorted(cls._parse_source(), key=lambda record: (-record[2], record[0]))
+        content:bytes = b''.join((
+            cls._HEADER.pack(cls._MAGIC, source_time, len(records)),
+            b''.join(cls._RECORD.pack(port, protocol, frequency) for port, protocol, frequency, _ in records),
+            '\n'.join(name for *_, name in records).encode()
+        ))
+
+        try:
+            with open(cls.INDEX_FILE, 'wb') as file:
+                file.write(content)
+        except OSError:
+            pass
+        return records
+
+
+
+    @classmethod
+    def _parse_source(cls) -> iter:
+        with open(cls.SOURCE_FILE) as file:
+            for line in file:
+                fields:list = line.split('#', 1)[0].split()
+                if len(fields) < 3: continue
+
+                name, port_protocol, frequency = fields[:3]
+                port, protocol = port_protocol.split('/')
+                yield int(port), cls._PROTOCOLS.index(protocol.lower()), float(frequency), name
@@ -0,0 +1,116 @@
+import contextlib
+import cProfile
+import pstats
+import tracemalloc
+from collections import Counter
+from contextlib  import contextmanager
+from threading   import Lock
+from utils       import scan_metrics
+
+
+class Stage_Profiler:
+
+    DEFAULT_FILE:str = 'netxplorer.pstats'
+
+    __slots__ = ('_output_file', '_top', '_profiles', '_peaks', '_shared_peaks', '_active', '_window', '_window_start', '_lock')
+
+    def __init__(self, output_file:str=DEFAULT_FILE, top:int=8) -> None:
+        self._output_file:str   = output_file
+        self._top:int           = top
+        self._profiles:dict     = {}
+        self._peaks:dict        = {}
+        self._shared_peaks:dict = {}
+        self._active:Counter    = Counter()
+        self._window:set        = set()
+        self._window_start:int  = 0
+        self._lock:Lock         = Lock()
+        tracemalloc.start()
+
+
+
+    @contextmanager
+    def profile(self, name:str):
+        profiler:cProfile.Profile = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None
+
+        self._open_window(name)
+        try:
+            yield
+        finally:
+            if profiler is not None: profiler.disable()
+            self._add_profile(name, profiler)
+
+
+
+    # The tracemalloc peak is global to the process, so the memory of stages that run at the same time (the
+    # sniffer thread and the senders) cannot be told apart: their peak is reported once for the whole group
+
+    def _open_window(self, name:str) -> None:
+        with self._lock:
+            if not self._active:
+                tracemalloc.reset_peak()
+                self._window       = set()
+                self._window_start = tracemalloc.get_traced_memory()[0]
+            self._active[name] += 1
+            self._window.add(name)
+
+
+
+    def _add_profile(self, name:str, profiler:cProfile.Profile|None) -> None:
+        with self._lock:
+            if profiler is not None:
+                self._profiles.setdefault(name, []).append(profiler)
+
+            self._active[name] -= 1
+            if self._active[name] == 0: del self._active[name]
+            if self._active: return
+
+            peak:int   = tracemalloc.get_traced_memory()[1] - self._window_start
+            peaks:dict = self._peaks if len(self._window) == 1 else self._shared_peaks
+            key:object = name if len(self._window) == 1 else tuple(sorted(self._window))
+            peaks[key] = max(peaks.get(key, 0), peak)
+
+
+
+    # REPORT =================================================================================================
+
+    def report(self, stages:dict) -> None:
+        print(f'-- Profile (saved in {self._output_file}) --')
+        print(f'Stage{7 * " "}Wall (s)  CPU (s)  Peak (KiB)')
+
+        shared:set = {name for names in self._shared_peaks for name in names}
+        for name, stage in stages.items():
+            if name in self._peaks: peak:str = f'{self._peaks[name] / 1024:.1f}'
+            else:                   peak:str = 'shared' if name in shared else '-'
+            print(f'{name:<11} {stage["wall"]:>8.3f}  {stage["cpu"]:>7.3f}  {peak:>10}')
+
+        for names, peak in self._shared_peaks.items():
+            print(f'Shared peak of {", ".join(names)}: {peak / 1024:.1f} KiB')
+
+        for name, profilers in self._profiles.items():
+            print(f'>> {name}')
+            for line in self._top_functions(pstats.Stats(*profilers)):
+                print(f'   {line}')
+
+        self._save_stats()
+
+
+
+    def _top_functions(self, stats:pstats.Stats) -> list[str]:
+        own_files:tuple = (__file__, scan_metrics.__file__, contextlib.__file__)
+        functions:list  = [item for item in stats.stats.items() if item[0][0] not in own_files]
+        ranked:list     = sorted(functions, key=lambda item: item[1][2], reverse=True)[:self._top]
+        return [
+            f'{total_time:>7.3f}s self {cumulative_time:>7.3f}s cum {calls:>8} calls  {pstats.func_std_string(function)}'
+            for function, (_, calls, total_time, cumulative_time, _) in ranked
+        ]
+
+
+
+    def _save_stats(self) -> None:
+        profilers:list = [profiler for profilers in self._profiles.values() for profiler in profilers]
+        if profilers:
+            pstats.Stats(*profilers).dump_stats(self._output_file)
@@ -0,0 +1,82 @@
+import sys
+import time
+from threading          import Thread, Event
+from utils.scan_metrics import Scan_Metrics
+
+
+class Status_Reporter:
+
+    __slots__ = ('_metrics', '_total', '_label', '_counter', '_responses', '_drops', '_interval', '_enabled', '_start', '_started', '_stop', '_thread')
+
+    def __init__(self, metrics:Scan_Metrics, total:int, label:str='Packets sent', counter:str='probes_sent', responses:str='frames_received', drops:tuple=('send_errors', 'kernel_drops'), enabled:bool=True, interval:float=0.25) -> None:
+        self._metrics:Scan_Metrics = metrics
+        self._total:int            = total
+        self._label:str            = label
+        self._counter:str          = counter
+        self._responses:str        = responses
+        self._drops:tuple          = drops
+        self._interval:float       = interval
+        self._enabled:bool         = enabled and sys.stdout.isatty()
+        self._start:dict           = {}
+        self._started:float        = None
+        self._stop:Event           = Event()
+        self._thread:Thread        = Thread(target=self._run, daemon=True)
+
+
+
+    def __enter__(self):
+        if self._enabled:
+            self._start   = {name: self._metrics.counter(name) for name in self._names()}
+            self._started = time.perf_counter()
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._enabled:
+            self._stop.set()
+            self._thread.join()
+        return False
+
+
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._draw()
+        self._draw()
+        sys.stdout.write('\n')
+        sys.stdout.flush()
+
+
+
+    def _names(self) -> tuple:
+        return (self._counter, *self._drops) + ((self._responses,) if self._responses else ())
+
+
+
+    def _value(self, name:str) -> int:
+        return self._metrics.counter(name) - self._start.get(name, 0)
+
+
+
+    # DISPLAY ================================================================================================
+
+    def _draw(self) -> None:
+        done:int      = self._value(self._counter)
+        elapsed:float = time.perf_counter() - self._started
+        rate:float    = done / elapsed if elapsed else 0
+        eta:str       = self._format_eta((self._total - done) / rate) if rate else '--:--'
+
+        line:str = f'\r{self._label}: {done}/{self._total}  {rate:.0f}/s  ETA {eta}'
+        if self._responses:
+            line += f'  responses: {self._value(self._responses)}'
+        line += f'  drops: {sum(self._value(name) for name in self._drops)}'
+
+        sys.stdout.write(f'{line}\033[K')
+        sys.stdout.flush()
+
+
+
+    @staticmethod
+    def _format_eta(seconds:float) -> str:
+        minutes, seconds = divmod(max(0, int(seconds)), 60)
+        return f'{minutes:02d}:{seconds:02d}'
@@ -0,0 +1,146 @@
+import ipaddress
+import socket
+import struct
+from bisect             import bisect_right
+from itertools          import chain
+from utils.dns_resolver import DNS_Resolver
+
+
+class Target_Index:
+
+    __slots__ = ('_starts', '_ends', '_size')
+
+    def __init__(self, intervals:iter=()) -> None:
+        self._starts:list = []
+        self._ends:list   = []
+        for start, end in sorted(intervals):
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+        self._size:int = sum(end - start + 1 for start, end in zip(self._starts, self._ends))
+
+
+
+    @classmethod
+    def from_specs(cls, includes:iter, excludes:iter=(), resolver:DNS_Resolver=None) -> 'Target_Index':
+        allowed:Target_Index = cls(cls._parse_specs(includes, resolver, hosts_only=True))
+        return allowed.subtract(cls(cls._parse_specs(excludes, resolver))) if excludes else allowed
+
+
+
+    @staticmethod
+    def read_file(path:str) -> iter:
+        with open(path) as file:
+            for line in file:
+                yield from line.split('#', 1)[0].replace(',', ' ').split()
+
+
+
+    # SET OPERATIONS =========================================================================================
+
+    def __contains__(self, ip:str|int) -> bool:
+        value:int = ip if isinstance(ip, int) else self._to_int(ip)
+        index:int = bisect_right(self._starts, value) - 1
+        return index >= 0 and value <= self._ends[index]
+
+
+
+    def __len__(self) -> int:
+        return self._size
+
+
+
+    def __iter__(self) -> iter:
+        for start, end in zip(self._starts, self._ends):
+            for value in range(start, end + 1):
+                yield socket.inet_ntoa(struct.pack('!I', value))
+
+
+
+    def intervals(self) -> iter:
+        return zip(self._starts, self._ends)
+
+
+
+    def union(self, other:'Target_Index') -> 'Target_Index':
+        return Target_Index(chain(self.intervals(), other.intervals()))
+
+
+
+    def subtract(self, other:'Target_Index') -> 'Target_Index':
+        allowed:list = []
+        for start, end in self.intervals():
+            index:int = bisect_right(other._ends, start - 1)
+            while start <= end and index < len(other._starts) and other._starts[index] <= end:
+                if other._starts[index] > start:
+                    allowed.append((start, other._starts[index] - 1))
+                start  = other._ends[index] + 1
+                index += 1
+            if start <= end:
+                allowed.append((start, end))
+        return Target_Index(allowed)
+
+
+
+    def split(self, key:callable) -> dict[object, 'Target_Index']:
+        groups:dict = {}
+        for start, end in self.intervals():
+            first:ipaddress.IPv4Address = ipaddress.IPv4Address(start)
+            for network in ipaddress.summarize_address_range(first, ipaddress.IPv4Address(end)):
+                groups.setdefault(key(str(network)), []).append((int(network[0]), int(network[-1])))
+        return {group: Target_Index(intervals) for group, intervals in groups.items()}
+
+
+
+    # PARSING ================================================================================================
+
+    @classmethod
+    def _parse_specs(cls, specs:iter, resolver:DNS_Resolver|None, hosts_only:bool=False) -> iter:
+        host_names:list = []
+        for spec in specs:
+            interval:tuple|None = cls._parse_spec(spec.strip(), hosts_only)
+            if interval is None: host_names.append(spec.strip())
+            else:                yield interval
+
+        if not host_names: return
+
+        addresses:dict = (resolver or DNS_Resolver()).forward(host_names)
+        unknown:list   = [host for host in host_names if addresses[host] is None]
+        if unknown:
+            raise Exception(f'Unknown host: {", ".join(unknown)}')
+
+        for host in host_names:
+            value:int = cls._to_int(addresses[host])
+            yield value, value
+
+
+
+    @staticmethod
+    def _parse_spec(spec:str, hosts_only:bool) -> tuple[int, int]|None:
+        try:
+            if '-' in spec:
+                first, last = spec.split('-', 1)
+                if '.' not in last:
+                    last = f'{first.rsplit(".", 1)[0]}.{last}'
+                start, end = int(ipaddress.IPv4Address(first)), int(ipaddress.IPv4Address(last))
+                if start > end: raise ValueError(f'Invalid range: {spec}')
+                return start, end
+
+            network:ipaddress.IPv4Network = ipaddress.IPv4Network(spec, strict=False)
+        except ipaddress.AddressValueError:
+            return None
+        except ipaddress.NetmaskValueError:
+            raise ValueError(f'Invalid network: {spec}')
+
+        start, end = int(network.network_address), int(network.broadcast_address)
+        if hosts_only and network.prefixlen < 31:
+            return start + 1, end - 1
+        return start, end
+
+
+
+    @staticmethod
+    def _to_int(ip:str) -> int:
+        return struct.unpack('!I', socket.inet_aton(ip))[0]
@@ -0,0 +1,182 @@
+import calendar
+import json
+import os
+import ssl
+import time
+from threading import Lock
+
+
+class TLS_Cache:
+
+    __slots__ = ('_context', '_sessions', '_certificates', '_ttl', '_cache_file', '_lock')
+
+    def __init__(self, ttl:int=86400) -> None:
+        self._context:ssl.SSLContext = self._create_context()
+        self._sessions:dict          = {}
+        self._certificates:dict      = {}
+        self._ttl:int                = ttl
+        self._cache_file:str         = None
+        self._lock:Lock              = Lock()
+
+
+
+    @staticmethod
+    def _create_context() -> ssl.SSLContext:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+
+
+    @property
+    def context(self) -> ssl.SSLContext:
+        return self._context
+
+
+
+    @staticmethod
+    def _key(ip:str, port:int, server_name:str) -> str:
+        return f'{ip}|{port}|{server_name}'
+
+
+
+    # SESSIONS ===============================================================================================
+
+    def get_session(self, ip:str, port:int, server_name:str) -> ssl.SSLSession|None:
+        with self._lock:
+            return self._sessions.get(self._key(ip, port, server_name))
+
+
+
+    def store_session(self, ip:str, port:int, server_name:str, session:ssl.SSLSession|None) -> None:
+        if session is None: return
+        with self._lock:
+            self._sessions[self._key(ip, port, server_name)] = session
+
+
+
+    # CERTIFICATES ===========================================================================================
+
+    def get_banner(self, ip:str, port:int, server_name:str, paths:list[str]) -> list[str]|None:
+        with self._lock:
+            cached:list = self._certificates.get(f'{self._key(ip, port, server_name)}|{",".join(paths)}')
+
+        if cached and cached[1] > time.time():
+            return cached[0]
+        return None
+
+
+
+    def store_banner(self, ip:str, port:int, server_name:str, paths:list[str], lines:list[str], not_after:float|None) -> None:
+        expires:float = time.time() + self._ttl
+        if not_after is not None:
+            expires = min(expires, not_after)
+
+        with self._lock:
+            self._certificates[f'{self._key(ip, port, server_name)}|{",".join(paths)}'] = [lines, expires]
+
+
+
+    # PERSISTENCE ============================================================================================
+
+    def load_cache(self, cache_file:str) -> None:
+        self._cache_file = cache_file
+        if not os.path.exists(cache_file): return
+
+        try:
+            with open(cache_file, 'r') as file:
+                self._certificates.update(json.load(file))
+        except (OSError, ValueError):
+            return
+
+
+
+    def save_cache(self) -> None:
+        if self._cache_file is None: return
+
+        now:float  = time.time()
+        valid:dict = {key: entry for key, entry in self._certificates.items() if entry[1] > now}
+        with open(self._cache_file, 'w') as file:
+            json.dump(valid, file)
+
+
+
+
+# CERTIFICATE DECODER ========================================================================================
+# The grabber does not verify certificates, so getpeercert() only returns the DER form.
+# These functions read the few fields that are displayed straight from the DER bytes.
+
+_NAME_ATTRIBUTES:dict = {
+    b'\x55\x04\x03': 'CN',
+    b'\x55\x04\x06': 'C',
+    b'\x55\x04\x07': 'L',
+    b'\x55\x04\x08': 'ST',
+    b'\x55\x04\x0a': 'O',
+    b'\x55\x04\x0b': 'OU',
+}
+
+
+
+def decode_certificate(der:bytes) -> dict|None:
+    try:
+        _, certificate, _ = _read_tlv(der, 0)
+        _, tbs, _         = _read_tlv(certificate, 0)
+        fields:list       = _children(tbs)
+
+        if fields[0][0] == 0xA0:
+            fields = fields[1:]
+
+        serial, _, issuer, validity, subject = fields[:5]
+        not_before, not_after = [_decode_time(tag, value) for tag, value in _children(validity[1])]
+
+        return {
+            'subject':      _decode_name(subject[1]),
+            'issuer':       _decode_name(issuer[1]),
+            'serialNumber': serial[1].hex().upper(),
+            'notBefore':    not_before,
+            'notAfter':     not_after
+        }
+    except (IndexError, ValueError):
+        return None
+
+
+
+def _read_tlv(data:bytes, offset:int) -> tuple[int, bytes, int]:
+    tag:int    = data[offset]
+    length:int = data[offset + 1]
+    offset    += 2
+
+    if length & 0x80:
+        size:int = length & 0x7F
+        length   = int.from_bytes(data[offset : offset + size], 'big')
+        offset  += size
+
+    return tag, data[offset : offset + length], offset + length
+
+
+
+def _children(data:bytes) -> list[tuple[int, bytes]]:
+    items:list = []
+    offset:int = 0
+    while offset < len(data):
+        tag, value, offset = _read_tlv(data, offset)
+        items.append((tag, value))
+    return items
+
+
+
+def _decode_name(data:bytes) -> str:
+    parts:list = []
+    for _, relative_name in _children(data):
+        for _, attribute in _children(relative_name):
+            (_, oid), (_, value) = _children(attribute)[:2]
+            parts.append(f'{_NAME_ATTRIBUTES.get(oid, oid.hex())}={value.decode(errors="ignore")}')
+    return ', '.join(parts)
+
+
+
+def _decode_time(tag:int, value:bytes) -> float:
+    text:str   = value.decode()
+    layout:str = '%y%m%d%H%M%SZ' if tag == 0x17 else '%Y%m%d%H%M%SZ'
+    return calendar.timegm(time.strptime(text, layout))